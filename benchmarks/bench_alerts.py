@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""bench_alerts.py – alert latency for a burst of fresh listings
+
+Starts a local mock Telegram Bot API (every ``sendMessage`` takes
+``--latency`` seconds) and measures how long ``telegram_alerts`` needs to
+deliver ``--listings`` new listings with different dispatcher settings.
+
+    python benchmarks/bench_alerts.py --listings 100 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import woko_scraper as ws  # noqa: E402
+from stub import QuietHandler, StubServer  # noqa: E402
+
+
+class MockBotAPI(StubServer):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.messages = 0
+        self.connections = 0
+        super().__init__(_BotHandler)
+
+
+class _BotHandler(QuietHandler):
+    protocol_version = "HTTP/1.1"  # keep‑alive, like the real Bot API
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.messages += 1
+        self.reply(200, b'{"ok":true,"result":{}}', {"Content-Type": "application/json"})
+
+
+def fresh_listings(n: int) -> list[ws.Listing]:
+    now = datetime.now(timezone.utc)
+    return [
+        ws.Listing(
+            id=20000 + i,
+            title=f"Room {i} near ETH",
+            posted_at=(now - timedelta(seconds=i)).isoformat(),
+            listing_type="Tenant",
+            link=f"https://woko.ch/en/zimmer-in-zuerich-details/{20000 + i}",
+        )
+        for i in range(n)
+    ]
+
+
+async def deliver(events: ws.EventLog, ledger: ws.AlertLedger, cfg: dict) -> float:
+    """Seconds ``telegram_alerts`` takes to send every pending event."""
+    async with ws.make_client() as client:
+        dispatcher = ws.AlertDispatcher(client, "TOKEN", "CHAT", **cfg)
+        started = time.perf_counter()
+        await ws.telegram_alerts(events, dispatcher, ledger)
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--listings", type=int, default=100)
+    p.add_argument("--latency", type=float, default=0.05, help="Mock sendMessage latency (s)")
+    args = p.parse_args()
+
+    server = MockBotAPI(args.latency).start()
+    ws.TELEGRAM_API = server.url
+    listings = fresh_listings(args.listings)
+
+    cases = {
+        "sequential": dict(workers=1, rate=1e6, burst=10**6, digest_threshold=0),
+        "concurrent x8": dict(workers=8, rate=1e6, burst=10**6, digest_threshold=0),
+        "concurrent x8, 30 msg/s": dict(workers=8, rate=30, burst=30, digest_threshold=0),
+        "digest": dict(workers=8, rate=1.0, burst=20, digest_threshold=10),
+    }
+    print(f"{args.listings} new listings, mock latency {args.latency * 1000:.0f} ms")
+    tmp = tempfile.TemporaryDirectory()
+    for n, (name, cfg) in enumerate(cases.items()):
+        server.messages = server.connections = 0
+        ledger = ws.AlertLedger(Path(tmp.name) / f"alerted-{n}.jsonl")
+        events = ws.EventLog(Path(tmp.name) / f"events-{n}.jsonl")
+        events.append(ws.Delta(new=listings))
+        elapsed = asyncio.run(deliver(events, ledger, cfg))
+        print(
+            f"  {name:<26} {elapsed:7.3f} s   "
+            f"{server.messages:4d} messages over {server.connections} connection(s)"
+        )
+    server.shutdown()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
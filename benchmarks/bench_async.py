@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""bench_async.py – many sources per cycle: worker threads vs. one event loop
+
+Serves ``fixtures/overview_zurich.html`` from a stub in a separate process
+that answers every request after ``--latency`` seconds, under as many
+distinct region URLs as ``--sources`` asks for.  One cycle fetches and
+parses all of them, once the way the former threaded engine did (a thread
+per region over a ``requests`` session, needs ``requests``) and once with
+``scrape_regions`` (tasks on one loop over ``httpx``, parsing on a single
+executor thread, at most ``--concurrency`` requests in flight over clients
+of ``--pool`` connections, as ``--async-concurrency`` / ``--http-pool-size``
+set up), and reports wall time, peak thread count and CPU time per cycle.
+Both must return the same listings.  Each engine first runs one untimed
+request, so imports and client setup are not measured.
+
+    python benchmarks/bench_async.py --sources 10 100 400 --latency 0.2 --concurrency 25 50 100
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+import woko_scraper as ws  # noqa: E402
+from stub import QuietHandler, StubServer  # noqa: E402
+
+FIXTURE = HERE / "fixtures" / "overview_zurich.html"
+
+
+def stub(port: multiprocessing.Value, latency: float) -> None:
+    body = FIXTURE.read_bytes()
+
+    class Handler(QuietHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.reply(200, body)
+
+    server = StubServer(Handler)
+    port.value = server.server_port
+    server.serve_forever()
+
+
+class PeakThreads(threading.Thread):
+    """Samples ``threading.active_count()`` until stopped (not counting itself)."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak, self.halt = 0, threading.Event()
+
+    def run(self) -> None:
+        while not self.halt.wait(0.001):
+            self.peak = max(self.peak, threading.active_count() - 1)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.halt.set()
+        self.join()
+
+
+def threaded_cycle(session, regions: list[ws.Region], parser: str) -> dict:
+    """The former engine: one thread and one blocking GET per region."""
+
+    def scrape(region: ws.Region):
+        resp = session.get(region.url, timeout=60)
+        resp.raise_for_status()
+        return ws.parse_overview(resp.text, parser, region), {}
+
+    with ThreadPoolExecutor(max_workers=len(regions)) as pool:
+        return dict(zip((r.name for r in regions), pool.map(scrape, regions)))
+
+
+def measure(fn) -> tuple[float, float, int, dict]:
+    with PeakThreads() as threads:
+        wall, cpu = time.perf_counter(), time.process_time()
+        pages = fn()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return wall, cpu, threads.peak, pages
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sources", type=int, nargs="+", default=[10, 100, 400])
+    p.add_argument("--latency", type=float, default=0.2, help="Stub response delay in seconds")
+    p.add_argument("--concurrency", type=int, nargs="+", default=[25, 100], help="Async requests in flight (--async-concurrency)")
+    p.add_argument("--pool", type=int, default=10, help="Connections per client (--http-pool-size)")
+    p.add_argument("--parser", default="stream", choices=sorted(ws.PARSERS))
+    args = p.parse_args()
+    logging.disable(logging.WARNING)
+    import requests  # type: ignore
+    import requests.adapters  # type: ignore
+
+    port = multiprocessing.Value("i", 0)
+    server = multiprocessing.Process(target=stub, args=(port, args.latency), daemon=True)
+    server.start()
+    while not port.value:
+        time.sleep(0.01)
+    base = f"http://127.0.0.1:{port.value}"
+
+    warmup = [ws.Region.from_url("warmup", f"{base}/warmup/en/zimmer-in-zuerich")]
+    print(f"stub latency {args.latency * 1000:.0f} ms, parser {args.parser}")
+    print(f"  {'sources':>7}  {'engine':<9} {'wall ms':>8} {'cpu ms':>8} {'threads':>7}")
+    for n in args.sources:
+        regions = [ws.Region.from_url(f"r{i}", f"{base}/r{i}/en/zimmer-in-zuerich") for i in range(n)]
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max(n, args.pool))
+        session.mount("http://", adapter)
+        threaded_cycle(session, warmup, args.parser)
+        reference = measure(lambda: threaded_cycle(session, regions, args.parser))
+
+        results = {"threads": reference}
+        for concurrency in args.concurrency:
+            loop = asyncio.new_event_loop()
+            executor = ThreadPoolExecutor(max_workers=1)
+            clients = [
+                ws.make_client(timeout=60, pool_size=args.pool)
+                for _ in range(math.ceil(concurrency / args.pool))
+            ]
+
+            def cycle(regions):
+                return loop.run_until_complete(ws.scrape_regions(
+                    clients, regions, {}, args.parser, None, None, executor, args.pool
+                ))
+
+            cycle(warmup)
+            results[f"async/{concurrency}"] = measure(lambda: cycle(regions))
+            for client in clients:
+                loop.run_until_complete(client.aclose())
+            loop.close()
+            executor.shutdown()
+        for name, (wall, cpu, threads, pages) in results.items():
+            print(f"  {n:>7}  {name:<9} {wall * 1000:>8.0f} {cpu * 1000:>8.0f} {threads:>7}")
+            if [page[0] for page in pages.values()] != [page[0] for page in reference[3].values()]:
+                sys.exit(f"{name} disagrees with threads at {n} sources")
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
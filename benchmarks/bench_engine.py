@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""bench_engine.py – pandas vs. plain‑Python pipeline per cycle
+
+Replays one cycle (load history → merge → write CSV → pick alert
+candidates) against synthetic histories of growing size, once with the
+former pandas implementation and once with the ``Listing`` records in
+woko_scraper, checks that both write the same CSV byte for byte and
+reports wall time and peak traced memory per cycle.  The plain cycle goes
+through ``save_if_changed`` – streamed, hashed and fsynced as in a poll –
+so its time includes the fsync pandas' ``to_csv`` skips.  The one‑off cost of
+``import pandas`` is measured in a fresh interpreter.
+
+The ``sqlite ms`` column is the incremental ``SqliteStore`` cycle (lookup of
+the live IDs → diff → apply one new and one vanished listing), whose cost
+should stay flat however large the history grows.
+
+What it shows: at the history this scraper actually keeps (~75 rows) a
+cycle is several times faster and lighter than pandas, and the ~0.5 s
+``import pandas`` is gone.  The CSV is streamed to disk, so no full copy of
+it sits in memory, but the cycle still loads and rewrites the whole history:
+from ~10k rows the cold cycle is only on par with pandas, and from a few
+tens of thousands the per‑row ``Listing`` objects take more memory than
+pandas' columns.  Histories that large belong in ``--store sqlite``.
+
+    python benchmarks/bench_engine.py --sizes 75 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import woko_scraper as ws  # noqa: E402
+
+
+# ── reference: the pandas pipeline this module used to run ──────────────────
+
+def pandas_cycle(live: list[dict], csv_path: Path, alerted: set[int], out: Path) -> None:
+    import pandas as pd  # type: ignore
+
+    new_df = pd.DataFrame(live)
+    old_df = pd.read_csv(csv_path, dtype={"id": int})
+    vanished = old_df[~old_df["id"].isin(new_df["id"])].copy()
+    if not vanished.empty:
+        vanished["status"] = "INACTIVE"
+        new_df = pd.concat([new_df, vanished], ignore_index=True)
+    df = new_df.sort_values("posted_at", ascending=False).reset_index(drop=True)
+    df.to_csv(out, index=False)
+    fresh = df[~df["id"].isin(alerted)]
+    [row for _, row in fresh.iterrows()]
+
+
+def plain_cycle(live: list[ws.Listing], csv_path: Path, alerted: set[int], out: Path) -> None:
+    warm_cycle(live, ws.load_history(csv_path), alerted, out)
+
+
+def warm_cycle(live: list[ws.Listing], history: dict, alerted: set[int], out: Path) -> None:
+    """Same cycle with the history already in memory, as in --daemon mode."""
+    merged = ws.merge_history(live, history)
+    out.unlink(missing_ok=True)  # every repeat must really write
+    ws.save_if_changed(merged, out)
+    [item for item in live if item.id not in alerted]
+
+def sqlite_cycle(store: ws.SqliteStore, live: list[ws.Listing], serial: list[int]) -> bool:
+    """One incremental poll: a fresh listing appears, the oldest live one goes."""
+    serial[0] += 1
+    template = live[-1]
+    live = [*live[1:], ws.Listing(serial[0], template.title, template.posted_at,
+                                  template.listing_type, template.link)]
+    known = store.fingerprints(item.id for item in live)
+    delta = ws.diff_history(live, known, store.active_ids())
+    return store.apply(live, delta)
+
+# ── harness ─────────────────────────────────────────────────────────────────
+
+def synthetic(n: int) -> list[ws.Listing]:
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        ws.Listing(
+            id=10000 + i,
+            title=(
+                "Nachmieter gesucht" if i % 7 == 0
+                else 'Studio "Sonnenhof"' if i % 11 == 0
+                else f"Room {i}, Kreis {i % 12 + 1}"
+            ),
+            posted_at=(start + timedelta(minutes=37 * i)).isoformat(),
+            listing_type="Tenant" if i % 3 else "Sublet",
+            link=f"https://woko.ch/en/zimmer-in-zuerich-details/{10000 + i}",
+            status="ACTIVE" if i >= n - 40 else "INACTIVE",
+        )
+        for i in range(n)
+    ]
+
+
+def overview_row(item: ws.Listing) -> dict:
+    return {name: getattr(item, name) for name in ws.CSV_FIELDS}
+
+
+def measure(fn, *args, repeat: int) -> tuple[float, int, bytes]:
+    """Best wall time, peak traced memory and the CSV the cycle wrote."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, args[-1].read_bytes()
+
+
+def timed(fn, *args) -> float:
+    started = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--sizes", type=int, nargs="+", default=[75, 1000, 10000])
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import pandas"], check=True)
+    pandas_import = time.perf_counter() - started
+    print(f"import pandas (fresh interpreter): {pandas_import * 1000:.0f} ms")
+
+    tmp = Path(tempfile.mkdtemp())
+    logging.disable(logging.INFO)
+    print(
+        f"{'history':>8}  {'pandas ms':>10} {'plain ms':>9} {'warm ms':>8} {'speedup':>8}"
+        f"  {'pandas KiB':>10} {'plain KiB':>9}  {'sqlite ms':>9}"
+    )
+    for n in args.sizes:
+        history = synthetic(n)
+        csv_path = tmp / f"history-{n}.csv"
+        csv_path.write_text(ws.render_csv(history))
+        live = history[-30:]  # 30 still online, 10 vanished since last poll
+        alerted = {item.id for item in history[:-5]}
+
+        out = tmp / f"out-{n}.csv"
+        pd_t, pd_mem, pd_csv = measure(
+            pandas_cycle, [overview_row(item) for item in live], csv_path, alerted, out,
+            repeat=args.repeat,
+        )
+        py_t, py_mem, py_csv = measure(plain_cycle, live, csv_path, alerted, out, repeat=args.repeat)
+        warm_t, _, warm_csv = measure(
+            warm_cycle, live, ws.load_history(csv_path), alerted, out, repeat=args.repeat
+        )
+        if not pd_csv == py_csv == warm_csv:
+            sys.exit(f"CSV output differs for history of {n}")
+
+        store = ws.SqliteStore(tmp / f"history-{n}.sqlite", seed_csv=csv_path)
+        sqlite_live = [item for item in history if item.status == "ACTIVE"]
+        store.active_ids()  # warm, as in --daemon
+        sq_t = min(timed(sqlite_cycle, store, sqlite_live, [10**6]) for _ in range(args.repeat))
+        print(
+            f"{n:>8}  {pd_t * 1000:>10.2f} {py_t * 1000:>9.2f} {warm_t * 1000:>8.2f}"
+            f" {pd_t / py_t:>7.1f}x  {pd_mem / 1024:>10.0f} {py_mem / 1024:>9.0f}"
+            f"  {sq_t * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
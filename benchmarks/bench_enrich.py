@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""bench_enrich.py – time to enrich a burst of new listings
+
+Serves ``fixtures/detail_zurich.html`` from a local stub (each request takes
+``--latency`` seconds) and measures how long ``DetailEnricher`` needs to
+fetch and parse ``--listings`` detail pages under different pool and
+politeness settings, starting from an empty cache.
+
+A second pass replays cycles against a warm ``DetailCache`` and counts the
+requests that reach the stub: none within the TTL, conditional GETs
+answered with 304 (and no re‑parse) once it expired.
+
+    python benchmarks/bench_enrich.py --listings 50 --latency 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+import woko_scraper as ws  # noqa: E402
+from stub import QuietHandler, StubServer  # noqa: E402
+
+
+class DetailStub(StubServer):
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.page = (HERE / "fixtures" / "detail_zurich.html").read_bytes()
+        self.in_flight = self.peak = self.requests = 0
+        super().__init__(_DetailHandler)
+
+
+class _DetailHandler(QuietHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.reply(304)
+        else:
+            self.reply(200, self.server.page, {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+
+async def enrich(
+    cache: ws.DetailCache, listings: list[ws.Listing], delta: ws.Delta, cfg: dict
+) -> tuple[float, dict, dict]:
+    """Seconds to fetch every detail page *delta* asks for, the results and the stats."""
+    async with ws.make_client() as client:
+        enricher = ws.DetailEnricher(client, cache, **cfg)
+        started = time.perf_counter()
+        enricher.submit(listings, delta)
+        await enricher.drain()
+        results = enricher.collect()
+        elapsed = time.perf_counter() - started
+        enricher.close()
+    return elapsed, results, enricher.stats
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--listings", type=int, default=50)
+    p.add_argument("--latency", type=float, default=0.05, help="Stub response latency (s)")
+    args = p.parse_args()
+    logging.disable(logging.INFO)
+
+    server = DetailStub(args.latency).start()
+    listings = [
+        ws.Listing(
+            30000 + i, f"Room {i}", "2025-10-23T08:00:00+00:00", "Tenant",
+            f"{server.url}/en/zimmer-in-zuerich-details/{30000 + i}",
+        )
+        for i in range(args.listings)
+    ]
+
+    cases = {
+        "sequential": dict(workers=1, per_host=1, host_rate=1e6),
+        "pool x8, 8 per host": dict(workers=8, per_host=8, host_rate=1e6),
+        "pool x8, 4 per host, 20/s": dict(workers=8, per_host=4, host_rate=20),
+        "defaults (4, 2, 2/s)": dict(workers=4, per_host=2, host_rate=2.0),
+    }
+    burst = ws.Delta(new=listings)
+    tmp = Path(tempfile.mkdtemp())
+    print(f"{args.listings} new listings, stub latency {args.latency * 1000:.0f} ms")
+    for n, (name, cfg) in enumerate(cases.items()):
+        server.peak = 0
+        cache = ws.DetailCache(tmp / f"cold-{n}")
+        elapsed, results, _ = asyncio.run(enrich(cache, listings, burst, cfg))
+        print(
+            f"  {name:<26} {elapsed:7.3f} s   {len(results)} enriched, "
+            f"peak {server.peak} concurrent request(s)"
+        )
+
+    print("steady state against a warm cache")
+    cache = ws.DetailCache(tmp / "cold-1")
+    for name, ttl, delta in (
+        ("within TTL", 86400.0, ws.Delta()),
+        ("TTL expired (304)", 0.0, ws.Delta()),
+    ):
+        cache.ttl = ttl
+        server.requests = 0
+        elapsed, _, stats = asyncio.run(
+            enrich(cache, listings, delta, dict(workers=8, per_host=8, host_rate=1e6))
+        )
+        print(
+            f"  {name:<26} {elapsed:7.3f} s   {server.requests} request(s), "
+            f"{stats['parsed']} re-parsed"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
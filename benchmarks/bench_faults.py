@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""bench_faults.py – polling a failing origin: retries, backoff and breaker
+
+Serves ``fixtures/overview_zurich.html`` from a local fault‑injecting stub:
+more than ``--limit`` requests per second get ``429`` with ``Retry-After``,
+a random ``--error-rate`` share gets ``503``, and everything between
+``--outage START END`` is ``503``.  For ``--duration`` a poll starts every
+``--interval`` (ticks missed while a poll is still retrying are dropped, as
+in the daemon), three ways:
+
+    legacy    ``requests`` with urllib3 status retries, no jitter (the former session)
+    retry     ``RetryPolicy`` – jittered backoff, honours Retry-After
+    breaker   ``RetryPolicy`` plus a ``CircuitBreakers`` guard
+
+Policy and breaker use woko_scraper's defaults.  Times are given in the
+daemon's seconds and run ``--time-scale`` times faster, so the defaults
+(60 s interval, 60 s cooldown…) play out in seconds of wall time.  The
+script reports polls that got the page, failed or were skipped by the
+breaker, requests the stub served, how many it refused (429 / 503),
+requests per successful poll and the *lag* from the outage's end to the
+first successful poll.
+
+    python benchmarks/bench_faults.py --duration 1800 --outage 300 900
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+import woko_scraper as ws  # noqa: E402
+from stub import QuietHandler, StubServer  # noqa: E402
+
+FIXTURE = HERE / "fixtures" / "overview_zurich.html"
+
+
+class FaultyOrigin:
+    """Counts and shapes the stub's responses; one instance per run."""
+
+    def __init__(self, limit: float, error_rate: float, outage: tuple[float, float], retry_after: int):
+        """*limit* and *retry_after* are in wall seconds, *outage* in scaled ones."""
+        self.bucket, self.limit = limit, limit
+        self.updated = self.started = time.monotonic()
+        self.error_rate, self.outage, self.retry_after = error_rate, outage, retry_after
+        self.rng = random.Random(1)
+        self.counts = {200: 0, 429: 0, 503: 0}
+        self.lock = threading.Lock()
+
+    def status(self) -> int:
+        with self.lock:
+            now = time.monotonic()
+            self.bucket = min(self.limit, self.bucket + (now - self.updated) * self.limit)
+            self.updated = now
+            if self.outage[0] <= now - self.started < self.outage[1] or self.rng.random() < self.error_rate:
+                code = 503
+            elif self.bucket < 1:
+                code = 429
+            else:
+                self.bucket -= 1
+                code = 200
+            self.counts[code] += 1
+            return code
+
+
+def serve(body: bytes) -> tuple[StubServer, list[FaultyOrigin]]:
+    current: list[FaultyOrigin] = []
+
+    class Handler(QuietHandler):
+        def do_GET(self):
+            origin = current[-1]
+            code = origin.status()
+            if code == 200:
+                self.reply(200, body)
+            else:
+                self.reply(code, headers={"Retry-After": str(origin.retry_after)} if code == 429 else None)
+
+    return StubServer(Handler).start(), current
+
+
+def legacy_poller(region: ws.Region, retries: int, backoff: float):
+    """One poll through the former ``requests`` session: GET, raise, parse."""
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+    from urllib3.util.retry import Retry  # type: ignore
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=ws.RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(max_retries=retry))
+
+    def poll() -> None:
+        resp = session.get(region.url)
+        resp.raise_for_status()
+        ws.parse_overview(resp.text, "stream", region)
+
+    return poll
+
+
+def poller(region: ws.Region, policy: ws.RetryPolicy, breakers: ws.CircuitBreakers | None):
+    """One poll through ``scrape_overview`` on a loop and client that outlive it."""
+    loop = asyncio.new_event_loop()
+    client = ws.make_client(timeout=5, retries=policy.retries)
+
+    def poll() -> None:
+        loop.run_until_complete(ws.scrape_overview(client, None, "stream", region, policy, breakers))
+
+    return poll
+
+
+def run(name: str, args, region: ws.Region, origins: list[FaultyOrigin]) -> None:
+    scale = args.time_scale
+    outage = (args.outage[0] * scale, args.outage[1] * scale)
+    origin = FaultyOrigin(args.limit, args.error_rate, outage, args.retry_after)
+    origins.append(origin)
+    defaults = ws.RetryPolicy()
+    policy = ws.RetryPolicy(defaults.retries, defaults.base * scale, defaults.cap * scale)
+    breakers = None
+    if name == "breaker":
+        breaker = ws.CircuitBreaker("")
+        breakers = ws.CircuitBreakers(
+            breaker.threshold, breaker.base_cooldown * scale, breaker.max_cooldown * scale
+        )
+    if name == "legacy":
+        poll = legacy_poller(region, defaults.retries, defaults.base * scale)
+    else:
+        poll = poller(region, policy, breakers)
+    ok = failed = skipped = 0
+    recovered = None
+    started = time.monotonic()
+    tick = started
+    while tick < started + args.duration * scale:
+        time.sleep(max(0.0, tick - time.monotonic()))
+        try:
+            poll()
+            ok += 1
+            if recovered is None and time.monotonic() - started >= outage[1]:
+                recovered = time.monotonic() - started - outage[1]
+        except ws.CircuitOpen:
+            skipped += 1
+        except Exception:
+            failed += 1
+        tick += args.interval * scale
+        while tick < time.monotonic():  # the daemon drops ticks a slow poll overran
+            tick += args.interval * scale
+    served = sum(origin.counts.values())
+    lag = f"{recovered / scale:>7.0f}" if recovered is not None else f"{'–':>7}"
+    print(
+        f"  {name:<8} {ok:>5} {failed:>6} {skipped:>7} {served:>8} "
+        f"{origin.counts[429]:>5} {origin.counts[503]:>5} {served / max(ok, 1):>8.2f} {lag}"
+    )
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--duration", type=float, default=1800.0, help="Daemon seconds to poll for")
+    p.add_argument("--interval", type=float, default=60.0, help="Daemon seconds between polls")
+    p.add_argument("--outage", type=float, nargs=2, default=[300.0, 900.0], metavar=("START", "END"))
+    p.add_argument("--time-scale", type=float, default=0.01, help="Wall seconds per daemon second")
+    p.add_argument("--limit", type=float, default=20.0, help="Requests per wall second the stub accepts")
+    p.add_argument("--error-rate", type=float, default=0.1, help="Share of random 503s")
+    p.add_argument("--retry-after", type=int, default=1, help="Retry-After wall seconds sent with 429")
+    args = p.parse_args()
+    logging.disable(logging.WARNING)
+
+    server, origins = serve(FIXTURE.read_bytes())
+    region = ws.Region.from_url("stub", f"http://127.0.0.1:{server.server_port}/en/zimmer-in-zuerich")
+    print(
+        f"{args.duration:g}s, a poll every {args.interval:g}s, outage {args.outage[0]:g}–{args.outage[1]:g}s"
+        f" (×{args.time_scale:g}); stub: {args.limit:g} req/s, {args.error_rate:.0%} random 503"
+    )
+    print(
+        f"  {'mode':<8} {'ok':>5} {'failed':>6} {'skipped':>7} {'requests':>8} {'429':>5} {'503':>5}"
+        f" {'req / ok':>8} {'lag s':>7}"
+    )
+    for name in ("legacy", "retry", "breaker"):
+        run(name, args, region, origins)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""bench_journal.py – git repository growth per store backend
+
+Replays ``--polls`` scrape cycles (one listing appears, one vanishes per
+poll) against a synthetic history of ``--history`` rows, committing the data
+files after every poll as the scrape workflow does – once with the ``csv``
+store, once with the ``journal`` store compacted every ``--compact-every``
+polls.  Reports the packed repository size after ``git gc`` and the time of a
+fresh ``git clone``; at the end the journal's folded CSV must equal the CSV
+store's byte for byte.
+
+    python benchmarks/bench_journal.py --history 2000 --polls 300
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import woko_scraper as ws  # noqa: E402
+from bench_engine import synthetic  # noqa: E402
+
+
+def git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def simulate(repo: Path, store_name: str, history: list[ws.Listing], polls: int, every: int) -> bytes:
+    repo.mkdir(parents=True)
+    git(repo, "init", "-q")
+    git(repo, "config", "user.email", "bench@example.invalid")
+    git(repo, "config", "user.name", "bench")
+    csv_path, log_path = repo / "listings.csv", repo / "events.jsonl"
+    csv_path.write_text(ws.render_csv(history))
+    git(repo, "add", "-A")
+    git(repo, "commit", "-qm", "seed")
+
+    events = ws.EventLog(log_path)
+    store = ws.JournalStore(csv_path, events) if store_name == "journal" else ws.CsvStore(csv_path)
+    live = [item for item in history if item.status == "ACTIVE"]
+    serial = max(item.id for item in history)
+    for poll in range(1, polls + 1):
+        serial += 1
+        template = live[-1]
+        live = [
+            ws.Listing(serial, f"Room {serial}", template.posted_at, template.listing_type,
+                       f"https://woko.ch/en/zimmer-in-zuerich-details/{serial}"),
+            *live[:-1],
+        ]
+        known = store.fingerprints(item.id for item in live)
+        delta = ws.diff_history(live, known, store.active_ids())
+        events.append(delta)
+        store.apply(live, delta)
+        events.commit("telegram", events.size())  # alerts consumed everything
+        if store_name == "journal" and poll % every == 0:
+            store.fold()
+            events.trim()
+        git(repo, "add", "-A")
+        git(repo, "commit", "-qm", f"poll {poll}")
+    if store_name == "journal":
+        store.fold()
+    return csv_path.read_bytes()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--history", type=int, default=2000)
+    p.add_argument("--polls", type=int, default=300)
+    p.add_argument("--compact-every", type=int, default=100)
+    args = p.parse_args()
+    logging.disable(logging.INFO)
+
+    tmp = Path(tempfile.mkdtemp())
+    history = synthetic(args.history)
+    print(f"{args.history} rows, {args.polls} polls, journal compacted every {args.compact_every}")
+    print(f"  {'store':<8} {'pack KiB':>9} {'clone ms':>9}")
+    outputs = {}
+    for name in ("csv", "journal"):
+        repo = tmp / name
+        outputs[name] = simulate(repo, name, history, args.polls, args.compact_every)
+        git(repo, "gc", "-q")
+        size = int(
+            next(line for line in git(repo, "count-objects", "-v").splitlines()
+                 if line.startswith("size-pack")).split()[1]
+        )
+        started = time.perf_counter()
+        subprocess.run(
+            ["git", "clone", "-q", "--no-local", str(repo), str(tmp / f"{name}-clone")], check=True
+        )
+        clone = time.perf_counter() - started
+        print(f"  {name:<8} {size:9d} {clone * 1000:9.0f}")
+    if outputs["csv"] != outputs["journal"]:
+        sys.exit("folded journal differs from the csv store's CSV")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""bench_parsers.py – parse time per overview page for each HTML backend
+
+Every backend in ``woko_scraper.PARSERS`` parses the saved fixtures in
+``benchmarks/fixtures``; the result must equal the ``bs4`` reference exactly
+(the script exits non‑zero otherwise).  Backends whose package is not
+installed are skipped.
+
+A second pass builds synthetic pages with ``--anchors`` listings each and
+reports µs per anchor – for ``_parse_anchor`` alone (against the former
+uncompiled, uncached version) and for every backend – so non‑linear growth
+shows up as a rising per‑anchor cost.
+
+    python benchmarks/bench_parsers.py --repeat 50 --anchors 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+import woko_scraper as ws  # noqa: E402
+
+
+def legacy_parse_anchor(href: str, text: str) -> dict | None:
+    """``_parse_anchor`` before patterns were compiled and timestamps cached."""
+    m_id = re.search(r"/(\d+)$", href)
+    if not m_id:
+        return None
+    text = " ".join(text.split())
+    m = re.search(
+        r"^(?P<title>.+?)\s+(?P<date>\d{2}\.\d{2}\.\d{4})\s+"
+        r"(?P<time>\d{2}:\d{2})\s+(?P<type>(?:Tenant|Sublet))\s+wanted",
+        text,
+        flags=re.I,
+    )
+    if not m:
+        return None
+    local_dt = datetime.strptime(
+        f"{m['date']} {m['time']}", "%d.%m.%Y %H:%M"
+    ).replace(tzinfo=ws.ZURICH_TZ)
+    return {
+        "id": int(m_id.group(1)),
+        "title": m["title"],
+        "posted_at": local_dt.astimezone(ws.UTC).isoformat(),
+        "listing_type": m["type"].capitalize(),
+        "link": href if href.startswith("http") else f"https://woko.ch{href}",
+        "status": "ACTIVE",
+        "region": ws.DEFAULT_REGION,
+    }
+
+
+def overview_row(item: ws.Listing) -> dict:
+    return {name: getattr(item, name) for name in ws.CSV_FIELDS}
+
+
+def synthetic_page(n: int) -> str:
+    """Overview page with *n* listings spread over ~30 distinct timestamps."""
+    anchors = "\n".join(
+        f'<div class="inserat"><a href="/en/zimmer-in-zuerich-details/{30000 + i}">'
+        f"<h3>Room {i} in shared flat, Kreis {i % 12 + 1}</h3>"
+        f"<span>{i % 28 + 1:02d}.10.2025 {8 + i % 3:02d}:{i % 60:02d}</span>"
+        f"<p>{'Tenant' if i % 3 else 'Sublet'} wanted</p><div>CHF {600 + i % 500}.–</div></a></div>"
+        for i in range(n)
+    )
+    return f"<html><body><div class=\"inserate\">\n{anchors}\n</div></body></html>"
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--repeat", type=int, default=20)
+    p.add_argument("--anchors", type=int, nargs="+", default=[100, 1000, 5000])
+    args = p.parse_args()
+
+    failed = False
+    for fixture in sorted(FIXTURES.glob("overview_*.html")):
+        html = fixture.read_text()
+        reference = ws.parse_overview(html, "bs4")
+        print(f"{fixture.name} ({len(html) / 1024:.0f} KiB, {len(reference)} listings)")
+        for name in ws.PARSERS:
+            try:
+                result = ws.parse_overview(html, name)
+            except ImportError as exc:
+                print(f"  {name:<11} skipped ({exc.name} not installed)")
+                continue
+            same = result == reference
+            failed |= not same
+            elapsed = best_of(lambda: ws.parse_overview(html, name), args.repeat)
+            print(f"  {name:<11} {elapsed * 1000:8.3f} ms/page   {'ok' if same else 'MISMATCH'}")
+
+    repeat = max(1, args.repeat // 5)
+    print("synthetic pages (µs per anchor)")
+    print(f"  {'anchors':>7}  {'legacy':>8} {'compiled':>8}  " + " ".join(f"{n:>10}" for n in ws.PARSERS))
+    for n in args.anchors:
+        html = synthetic_page(n)
+        pairs = list(ws.PARSERS["stream"](html, ws.REGIONS[ws.DEFAULT_REGION].marker))
+        legacy = best_of(lambda: [legacy_parse_anchor(h, t) for h, t in pairs], repeat)
+        ws._posted_at_utc.cache_clear()
+        compiled = best_of(lambda: [ws._parse_anchor(h, t) for h, t in pairs], repeat)
+        if [legacy_parse_anchor(h, t) for h, t in pairs] != [
+            overview_row(ws._parse_anchor(h, t)) for h, t in pairs
+        ]:
+            print(f"  MISMATCH between legacy and compiled _parse_anchor at {n} anchors")
+            failed = True
+        cells = []
+        for name in ws.PARSERS:
+            try:
+                cells.append(f"{best_of(lambda: ws.parse_overview(html, name), repeat) / n * 1e6:>10.2f}")
+            except ImportError:
+                cells.append(f"{'-':>10}")
+        print(f"  {n:>7}  {legacy / n * 1e6:>8.2f} {compiled / n * 1e6:>8.2f}  " + " ".join(cells))
+    print(f"  timestamp cache: {ws._posted_at_utc.cache_info()}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""bench_schedule.py – time to detect per poll budget, fixed vs. adaptive
+
+Learns a ``PollSchedule`` from the older ``--train`` share of the history's
+``posted_at`` values, then replays the newer rest: every posting is detected
+by the first poll at or after it.  ``posted_at`` has minute resolution, so
+each posting is placed at a random second of its minute and the first poll
+at a random offset (``--seed``), averaged over ``--runs`` draws.  For each
+``--budgets`` value (polls per day) the fixed cadence and the adaptive
+schedule are compared on polls made and mean / p95 seconds from posting to
+detection.
+
+    python benchmarks/bench_schedule.py --csv data/woko_listings.csv --budgets 288 1440
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import woko_scraper as ws  # noqa: E402
+
+
+def poll_times(start: datetime, end: datetime, delay) -> list[datetime]:
+    polls, now = [], start
+    while now <= end:
+        polls.append(now)
+        now += timedelta(seconds=delay(now))
+    return polls
+
+
+def detection(posted: list[datetime], polls: list[datetime]) -> tuple[float, float]:
+    waits = sorted(
+        (polls[i] - t).total_seconds()
+        for t in posted
+        if (i := bisect.bisect_left(polls, t)) < len(polls)
+    )
+    return sum(waits) / len(waits), waits[int(0.95 * (len(waits) - 1))]
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--csv", type=Path, default=Path("data/woko_listings.csv"))
+    p.add_argument("--budgets", type=float, nargs="+", default=[288, 1440])
+    p.add_argument("--train", type=float, default=0.67, help="Share of the history to learn from")
+    p.add_argument("--min-interval", type=float, default=15.0)
+    p.add_argument("--max-interval", type=float, default=900.0)
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+
+    listings = sorted(ws.load_history(args.csv).values(), key=lambda item: item.posted_at)
+    cut = int(len(listings) * args.train)
+    train, test = listings[:cut], listings[cut:]
+    if not train or not test:
+        sys.exit("history too short to split")
+    minutes = [datetime.fromisoformat(item.posted_at) for item in test]
+    start, end = minutes[0] - timedelta(hours=1), minutes[-1] + timedelta(hours=1)
+    rng = random.Random(args.seed)
+    days = (end - start).total_seconds() / 86400
+    print(f"learned from {len(train)} postings, replaying {len(test)} over {days:.1f} days")
+    print(f"  {'budget/day':>10} {'schedule':<9} {'polls':>7} {'mean s':>8} {'p95 s':>8}")
+    for budget in args.budgets:
+        schedule = ws.PollSchedule.from_history(train, budget, args.min_interval, args.max_interval)
+        draws = [
+            ([t + timedelta(seconds=rng.uniform(0, 60)) for t in minutes],
+             start + timedelta(seconds=rng.uniform(0, 900)))
+            for _ in range(args.runs)
+        ]
+        for name, delay in (("fixed", lambda now: 86400 / budget), ("adaptive", schedule.delay)):
+            results = []
+            for posted, first in draws:
+                polls = poll_times(first, end, delay)
+                results.append((len(polls), *detection(posted, polls)))
+            polls, mean, p95 = (sum(column) / len(results) for column in zip(*results))
+            print(f"  {budget:>10.0f} {name:<9} {polls:>7.0f} {mean:>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
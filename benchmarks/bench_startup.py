@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""bench_startup.py – cold‑start budget check based on ``-X importtime``
+
+Runs ``woko_scraper.py --help`` and a no‑change poll (a local stub that
+answers the conditional GET with 304) in fresh interpreters, reports wall
+time and import time, and exits non‑zero when a budget is exceeded or a
+heavy dependency is imported where it is not needed.
+
+    python benchmarks/bench_startup.py --help-budget 0.5 --poll-budget 1.0
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from stub import QuietFileHandler, StubServer
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "woko_scraper.py"
+HEAVY = ("pandas", "bs4")  # must stay out of --help and of no‑change polls
+
+PAGE = """<html><body>
+<a href="/en/zimmer-in-zuerich-details/10342"><h3>Room</h3>
+<span>23.10.2025 10:00</span><p>Sublet wanted</p></a>
+</body></html>"""
+
+
+def run(cmd: list[str], repeat: int) -> tuple[float, float, set[str]]:
+    """Return best wall time (s), import time (s) and imported top‑level names."""
+    best_wall, best_imports, modules = float("inf"), float("inf"), set()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", *cmd],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        wall = time.perf_counter() - started
+        if proc.returncode:
+            sys.exit(f"command failed: {cmd}\n{proc.stderr}")
+        total = 0
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = (part for part in line[12:].split("|"))
+            modules.add(name.strip().split(".")[0])
+            if not name.startswith("  "):  # top‑level import
+                total += int(cumulative)
+        best_wall, best_imports = min(best_wall, wall), min(best_imports, total / 1e6)
+    return best_wall, best_imports, modules
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--help-budget", type=float, default=0.5, help="Max wall seconds for --help")
+    p.add_argument("--poll-budget", type=float, default=1.0, help="Max wall seconds for a no-change poll")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    # every file the poll writes lives in tmp, never in the repo's data/
+    tmp = Path(tempfile.mkdtemp())
+    (tmp / "overview.html").write_text(PAGE)
+    server = StubServer(partial(QuietFileHandler, directory=str(tmp))).start()
+    url = f"{server.url}/overview.html"
+    files = ["--csv", str(tmp / "h.csv"), "--ledger", str(tmp / "l.jsonl"), "--events", str(tmp / "ev.jsonl")]
+    poll = [
+        "-c",
+        f"import sys; sys.argv[0] = {str(SCRIPT)!r}; sys.path.insert(0, {str(ROOT)!r});"
+        f"import woko_scraper as w; w.REGIONS['zurich'] = w.Region('zurich', {url!r}, w.REGIONS['zurich'].marker);"
+        f"w.main({files!r})",
+    ]
+    failed = False
+    try:
+        run(poll, 1)  # prime history + validators so the measured polls get a 304
+        for name, cmd, budget in (
+            ("--help", [str(SCRIPT), "--help"], args.help_budget),
+            ("no-change poll", poll, args.poll_budget),
+        ):
+            wall, imports, modules = run(cmd, args.repeat)
+            heavy = sorted(set(HEAVY) & modules)
+            ok = wall <= budget and not heavy
+            failed |= not ok
+            print(
+                f"{'ok  ' if ok else 'FAIL'} {name:<15} wall {wall * 1000:7.1f} ms "
+                f"(budget {budget * 1000:.0f})  imports {imports * 1000:7.1f} ms"
+                + (f"  heavy imports: {', '.join(heavy)}" if heavy else "")
+            )
+    finally:
+        server.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
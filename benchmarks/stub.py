@@ -0,0 +1,52 @@
+"""stub.py – the local HTTP server the benchmarks serve their fixtures from
+
+``StubServer`` binds a free port on 127.0.0.1, serves from a daemon thread
+and is a context manager that shuts down on exit.  Handlers subclass
+``QuietHandler`` (or ``QuietFileHandler`` for a directory) and answer with
+``reply``; shared counters go on the server under ``server.lock``.
+"""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # fan‑out benchmarks open hundreds of connections at once; the default
+    # listen backlog of 5 turns that into connect timeouts
+    request_queue_size = 1024
+
+    def __init__(self, handler):
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), handler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> StubServer:
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        super().__exit__(*exc)
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    def reply(self, code: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+        self.send_response(code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class QuietFileHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
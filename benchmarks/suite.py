@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""suite.py – per‑stage timings for the whole scrape pipeline, as JSON
+
+Runs offline against ``fixtures/overview_zurich.html`` and copies of it
+scaled to ``--scales`` times as many anchors (fresh IDs per copy) and times
+each stage on its own:
+
+    parse_anchor         ``_parse_anchor`` over the page's (href, text) pairs
+    parse_overview.<p>   anchor extraction + parsing with every installed backend
+    scrape_overview      the fetch path against a stub client (no network)
+    diff_history         the poll's delta against a history 3× the page
+    merge_history        live rows merged into that history
+    save.write / save.unchanged   ``save_if_changed`` with and without a change
+    alerts.single / alerts.digest ``_format_alert`` / ``_format_digests``
+
+Each stage records the median and the minimum of ``--repeat`` samples of
+``timeit`` autoranged loops, in seconds per call; comparisons use the
+minimum, the figure least disturbed by other load on the machine.  Results go to ``benchmarks/results/<commit>.json``
+(or ``--output``); ``--compare OLD.json`` prints the ratio per stage and exits
+non‑zero when one got slower than ``--tolerance``.
+
+    python benchmarks/suite.py --scales 1 10 100 1000
+    python benchmarks/suite.py --compare benchmarks/results/3c517f0.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parent))
+import woko_scraper as ws  # noqa: E402
+from bench_engine import synthetic  # noqa: E402
+
+FIXTURE = HERE / "fixtures" / "overview_zurich.html"
+_BODY = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.S | re.I)
+_DETAIL_ID = re.compile(r"(-details/)(\d+)")
+
+
+def scaled_page(html: str, scale: int) -> str:
+    """*html* with its body repeated *scale* times, each copy with fresh IDs."""
+    if scale == 1:
+        return html
+    m = _BODY.search(html)
+    copies = "".join(
+        _DETAIL_ID.sub(lambda d, n=n: f"{d[1]}{int(d[2]) + n * 1_000_000}", m[2])
+        for n in range(scale)
+    )
+    return html[: m.start(2)] + copies + html[m.end(2):]
+
+
+class StubResponse:
+    status_code = 200
+    headers: dict = {}
+
+    def __init__(self, body: bytes):
+        self.content = body
+        self.text = body.decode()
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+class StubClient:
+    """Stands in for ``httpx.AsyncClient``: every GET returns the same page."""
+
+    def __init__(self, html: str):
+        self.response = StubResponse(html.encode())
+
+    async def get(self, url, headers=None):
+        return self.response
+
+
+def measure(fn, repeat: int) -> dict:
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    samples = [t / loops for t in timer.repeat(repeat, loops)]
+    return {"median": statistics.median(samples), "min": min(samples), "loops": loops}
+
+
+def run_stages(scale: int, repeat: int, tmp: Path) -> dict[str, dict]:
+    html = scaled_page(FIXTURE.read_text(), scale)
+    region = ws.REGIONS[ws.DEFAULT_REGION]
+    pairs = list(ws.PARSERS["stream"](html, region.marker))
+    live = ws.parse_overview(html, "stream")
+    history = {item.id: item for item in synthetic(2 * len(live))}
+    history.update((item.id, item) for item in live)  # the page is already known
+    active = {i for i, item in history.items() if item.status == "ACTIVE"}
+    known = {i: (item.status, item.fingerprint()) for i, item in history.items()}
+    merged = ws.merge_history(live, history)
+    csv_path = tmp / f"history-{scale}.csv"
+    client = StubClient(html)
+    loop = asyncio.new_event_loop()
+    flip = [merged, [ws._with_status(merged[0], "INACTIVE"), *merged[1:]]]
+
+    def save_write():
+        flip.reverse()
+        ws.save_if_changed(flip[0], csv_path)
+
+    stages = {
+        "parse_anchor": lambda: [ws._parse_anchor(href, text) for href, text in pairs],
+        **{
+            f"parse_overview.{name}": (lambda name=name: ws.parse_overview(html, name))
+            for name in ws.PARSERS
+        },
+        "scrape_overview": lambda: loop.run_until_complete(
+            ws.scrape_overview(client, None, "stream", region)
+        ),
+        "diff_history": lambda: ws.diff_history(live, known, active),
+        "merge_history": lambda: ws.merge_history(live, history),
+        "save.write": save_write,
+        "save.unchanged": lambda: ws.save_if_changed(flip[0], csv_path),
+        "alerts.single": lambda: [ws._format_alert(row) for row in live],
+        "alerts.digest": lambda: ws._format_digests(live),
+    }
+    results = {}
+    for name, fn in stages.items():
+        try:
+            fn()
+        except ImportError as exc:  # optional parser backend not installed
+            print(f"  {name:<28} skipped ({exc.name} not installed)")
+            continue
+        result = measure(fn, repeat)
+        result.update(scale=scale, anchors=len(pairs))
+        results[f"{name}[{scale}x]"] = result
+        print(f"  {name:<28} {result['median'] * 1e3:10.3f} ms   ({len(pairs)} anchors)")
+    return results
+
+
+def commit_id() -> str:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(HERE), "rev-parse", "--short", "HEAD"],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: dict, baseline_path: Path, tolerance: float) -> bool:
+    """Print current / baseline per stage; return whether any regressed."""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\ncompared with {baseline_path} ({baseline['meta']['commit']})")
+    regressed = False
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = result["min"] / old["min"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        regressed |= bool(flag)
+        print(f"  {name:<34} {old['min'] * 1e3:10.3f} → {result['min'] * 1e3:10.3f} ms  {ratio:5.2f}x {flag}")
+    return regressed
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--output", type=Path, help="Results file (default benchmarks/results/<commit>.json)")
+    p.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    p.add_argument("--tolerance", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    args = p.parse_args()
+    logging.disable(logging.INFO)
+
+    commit = commit_id()
+    report = {
+        "meta": {
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            print(f"{FIXTURE.name} × {scale}")
+            report["results"].update(run_stages(scale, args.repeat, Path(tmp)))
+
+    output = args.output or HERE / "results" / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nresults → {output}")
+    if args.compare and compare(report, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import hashlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import woko_scraper as ws  # noqa: E402
+
+
+class Woko(ThreadingHTTPServer):
+    """Stub of one WOKO overview page and of the Telegram Bot API.
+
+    ``listings`` maps an ID to ``(title, "dd.mm.yyyy HH:MM")``; the page is
+    rendered from it on every request and carries an ETag, so unchanged
+    polls get a 304.  Sent Telegram texts collect in ``messages``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.listings: dict[int, tuple[str, str]] = {}
+        self.messages: list[str] = []
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _Handler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def page(self) -> bytes:
+        cards = "\n".join(
+            f'<div class="inserat"><a href="/en/zimmer-in-zuerich-details/{listing_id}">'
+            f'<div class="titel"><h3>{title}</h3><span>{posted}</span></div>'
+            f'<div class="bezeichnung"><p>Tenant wanted</p></div></a></div>'
+            for listing_id, (title, posted) in sorted(self.listings.items(), reverse=True)
+        )
+        return f'<html><body><div class="inserate">\n{cards}\n</div></body></html>'.encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = self.server.page()
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self._reply(304, b"", etag)
+        else:
+            self._reply(200, body, etag)
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+        with self.server.lock:
+            self.server.messages.append(form["text"][0])
+        self._reply(200, b'{"ok":true,"result":{}}')
+
+    def _reply(self, code: int, body: bytes, etag: str | None = None) -> None:
+        self.send_response(code)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def woko(monkeypatch):
+    server = Woko()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(ws, "TELEGRAM_API", server.url)
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "TOKEN")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "CHAT")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scrape(woko, tmp_path):
+    """Run ``woko_scraper.main`` once against the stub, with every file in *tmp_path*."""
+    files = [
+        "--regions", f"zurich={woko.url}/en/zimmer-in-zuerich",
+        "--csv", str(tmp_path / "listings.csv"),
+        "--db", str(tmp_path / "listings.sqlite"),
+        "--ledger", str(tmp_path / "alerted.jsonl"),
+        "--events", str(tmp_path / "events.jsonl"),
+    ]
+
+    def run(*args: str) -> None:
+        ws.main([*files, *args])
+
+    return run
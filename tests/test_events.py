@@ -0,0 +1,61 @@
+import json
+
+import woko_scraper as ws
+
+
+def listing(listing_id: int, title: str = "Room") -> ws.Listing:
+    return ws.Listing(
+        listing_id, title, "2025-10-23T10:00:00+02:00", "Tenant",
+        f"https://www.woko.ch/en/zimmer-in-zuerich-details/{listing_id}",
+    )
+
+
+def read_events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_append_drops_half_written_last_line(tmp_path):
+    log = ws.EventLog(tmp_path / "events.jsonl")
+    log.append(ws.Delta(new=[listing(1)]))
+    with log.path.open("a") as fh:
+        fh.write('{"at": "2025-10-23T08:00:00", "event": "NE')  # killed mid‑write
+
+    log.append(ws.Delta(new=[listing(2)]))
+    log.append_details({2: {"rent": "700"}})
+
+    assert [(e["event"], e["id"]) for e in read_events(log.path)] == [
+        ("NEW", 1), ("NEW", 2), ("DETAILS", 2),
+    ]
+    assert [event["id"] for event, _ in log.tail("reader")] == [1, 2, 2]
+
+
+def test_append_without_any_complete_line(tmp_path):
+    log = ws.EventLog(tmp_path / "events.jsonl")
+    log.path.write_text('{"at": "2025')
+
+    log.append(ws.Delta(vanished=[7]))
+
+    assert [(e["event"], e["id"]) for e in read_events(log.path)] == [("VANISHED", 7)]
+
+
+def test_trim_waits_for_the_slowest_consumer(tmp_path):
+    log = ws.EventLog(tmp_path / "events.jsonl")
+    log.append(ws.Delta(new=[listing(1), listing(2)]))
+    first = next(log.tail("fast"))[1]
+    log.commit("fast", log.size())
+    log.commit("slow", first)
+
+    assert log.trim(0.6) == 0  # one of two events consumed by everyone
+    assert log.trim() == first
+    assert [event["id"] for event, _ in log.tail("slow")] == [2]
+    assert list(log.tail("fast")) == []
+
+
+def test_journal_store_keeps_unfolded_events(tmp_path):
+    log = ws.EventLog(tmp_path / "events.jsonl")
+    ws.JournalStore(tmp_path / "listings.csv", log)
+    log.append(ws.Delta(new=[listing(1)]))
+    log.commit("telegram", log.size())
+
+    assert log.trim(0.5) == 0
+    assert [event["id"] for event, _ in log.tail("snapshot")] == [1]
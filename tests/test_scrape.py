@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+import woko_scraper as ws
+
+
+def events(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_alerts_each_new_listing_once(woko, scrape):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00")}
+    scrape()  # seeds the ledger: nothing to alert yet
+    woko.listings[11] = ("Room B", "23.10.2025 11:00")
+    scrape()
+    scrape()  # 304, nothing pending
+
+    assert len(woko.messages) == 1 and "Room B" in woko.messages[0]
+
+
+def test_ledger_does_not_realert_after_a_crash(woko, scrape, monkeypatch):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00")}
+    scrape()
+    woko.listings[11] = ("Room B", "23.10.2025 11:00")
+
+    # killed after the alert went out and the ledger recorded it, before the
+    # event cursor moved: the restarted poll replays the NEW event
+    commit = ws.EventLog.commit
+
+    def crash(self, consumer, offset):
+        if consumer == "telegram":
+            raise KeyboardInterrupt
+        commit(self, consumer, offset)
+
+    monkeypatch.setattr(ws.EventLog, "commit", crash)
+    with pytest.raises(KeyboardInterrupt):
+        scrape()
+    monkeypatch.setattr(ws.EventLog, "commit", commit)
+    scrape()
+
+    assert len(woko.messages) == 1
+
+
+def test_truncated_ledger_line_is_recovered(woko, scrape, tmp_path):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00")}
+    scrape()
+    ledger = tmp_path / "alerted.jsonl"
+    with ledger.open("a") as fh:
+        fh.write('{"id": 99, "alerted_')
+    woko.listings[11] = ("Room B", "23.10.2025 11:00")
+    scrape()
+
+    assert [json.loads(line)["id"] for line in ledger.read_text().splitlines()] == [10, 11]
+    assert len(woko.messages) == 1
+
+
+def test_truncated_event_line_is_recovered(woko, scrape, tmp_path):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00")}
+    scrape("--store", "journal")
+    log = tmp_path / "events.jsonl"
+    with log.open("a") as fh:
+        fh.write('{"at": "2025-10-23T10:00:00", "ev')
+    woko.listings[11] = ("Room B", "23.10.2025 11:00")
+    scrape("--store", "journal")
+
+    assert [(e["event"], e["id"]) for e in events(log)] == [("NEW", 10), ("NEW", 11)]
+    assert len(woko.messages) == 1
+
+
+def test_edit_is_one_changed_event(woko, scrape, tmp_path):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00"), 11: ("Room B", "23.10.2025 11:00")}
+    scrape("--store", "journal")
+    woko.listings[10] = ("Room A, now furnished", "23.10.2025 10:00")
+    scrape("--store", "journal")
+    scrape("--store", "journal")
+
+    changed = [e for e in events(tmp_path / "events.jsonl") if e["event"] == "CHANGED"]
+    assert len(changed) == 1
+    assert changed[0]["id"] == 10
+    assert changed[0]["changes"] == {"title": ["Room A", "Room A, now furnished"]}
+
+
+def test_compact_then_export_reproduces_the_csv(woko, scrape, tmp_path):
+    csv = tmp_path / "listings.csv"
+    reference = tmp_path / "reference"
+    polls = [
+        {10: ("Room A", "23.10.2025 10:00"), 11: ("Room B", "23.10.2025 11:00")},
+        {11: ("Room B", "23.10.2025 11:00"), 12: ("Room C", "24.10.2025 09:15")},
+        {10: ("Room A", "23.10.2025 10:00"), 12: ("Room C, renovated", "24.10.2025 09:15")},
+    ]
+    for listings in polls:
+        woko.listings = listings
+        scrape()  # csv store: rewrites the CSV every changed poll
+    reference.write_bytes(csv.read_bytes())
+    csv.unlink()
+    for name in ("events.jsonl", "events.cursors.json", "alerted.jsonl", "listings.http.json"):
+        (tmp_path / name).unlink(missing_ok=True)
+
+    for listings in polls:
+        woko.listings = listings
+        scrape("--store", "journal")
+    assert not csv.exists()  # the journal store only appends events
+    scrape("--store", "journal", "--compact")
+    assert csv.read_bytes() == reference.read_bytes()
+    scrape("--store", "journal", "--export-csv")
+    assert csv.read_bytes() == reference.read_bytes()
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+HEAVY = {"pandas", "bs4"}  # must stay out of --help and of no‑change polls
+IMPORT_BUDGET = 0.5  # seconds of top‑level imports; bench_startup.py measures the wall time
+
+
+def importtime(*args: str, env: dict[str, str] | None = None) -> tuple[float, set[str]]:
+    """Top‑level import seconds and imported top‑level modules of one run."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ROOT / "woko_scraper.py"), *args],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, **(env or {})}, check=True,
+    )
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[12:].split("|")
+        modules.add(name.strip().split(".")[0])
+        if not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1e6, modules
+
+
+def test_help_stays_light():
+    seconds, modules = importtime("--help")
+
+    assert not HEAVY & modules
+    assert seconds < IMPORT_BUDGET
+
+
+def test_no_change_poll_stays_light(woko, tmp_path):
+    woko.listings = {10: ("Room A", "23.10.2025 10:00")}
+    args = (
+        "--regions", f"zurich={woko.url}/en/zimmer-in-zuerich",
+        "--csv", str(tmp_path / "listings.csv"),
+        "--ledger", str(tmp_path / "alerted.jsonl"),
+        "--events", str(tmp_path / "events.jsonl"),
+    )
+    env = {"TELEGRAM_API_URL": woko.url}
+    importtime(*args, env=env)  # primes history and validators: the next poll gets a 304
+
+    seconds, modules = importtime(*args, env=env)
+
+    assert not HEAVY & modules
+    assert seconds < IMPORT_BUDGET
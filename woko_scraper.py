@@ -1,26 +1,26 @@
 #!/usr/bin/env python3
 """woko_scraper.py – WOKO Zürich listings watcher
 
-▸ Scrapes https://woko.ch/en/zimmer-in-zuerich.
+▸ Scrapes https://woko.ch/en/zimmer-in-zuerich (and, with ``--regions``, the
+  Winterthur / Wädenswil pages or any other WOKO overview URL).
 ▸ Maintains **woko_listings.csv** (adds new, marks vanished as INACTIVE).
-▸ Sends Telegram alerts for *Tenant wanted* postings newer than a configurable
-  *fresh‑window* (default 5 min, overridable by env‑var or CLI flag).
+▸ Sends one Telegram alert per new listing, exactly once: alerted IDs are
+  kept in an append‑only ledger (**woko_alerted.jsonl**).
 
-Dependencies (`pip install -q pandas requests beautifulsoup4`) are auto‑installed
-if missing so the script runs identically on local machines, GitHub Actions,
-Kaggle, etc.
+Each poll is a conditional GET per region; a changed page is parsed, diffed
+against the history into a ``Delta``, appended to the event log
+(**woko_events.jsonl**) and applied to the ``csv``, ``sqlite`` or
+``journal`` store, and the alerts consume the log's NEW events.  Fetches,
+alerts and detail enrichment run on one asyncio loop over ``httpx``.
 
-Environment variables (set as GitHub *Secrets & vars → Actions* or locally):
---------------------------------------------------------------------------
-TELEGRAM_BOT_TOKEN   Telegram bot token (from @BotFather)
-TELEGRAM_CHAT_ID     Chat / channel / user ID to receive alerts
-TIME_WINDOW_MINUTES  Fresh‑window override (integer, optional)
-LOG_LEVEL            Python logging level (INFO, DEBUG…)
+python woko_scraper.py --bootstrap             # install requirements.txt once
+python woko_scraper.py                         # single poll
+python woko_scraper.py --daemon --interval 15  # stay resident, poll every 15 s
+python woko_scraper.py --store journal --compact-after 14  # what CI runs
 
-CLI usage
----------
-python woko_scraper.py                    # default behaviour, 5‑min window
-python woko_scraper.py --fresh-window 30  # override via flag
+TELEGRAM_BOT_TOKEN / TELEGRAM_CHAT_ID enable alerts.  README.md lists the
+other environment variables and describes the stores, scheduling, retries,
+metrics and the Actions workflow.
 
 The script **never exits with non‑zero status**, so CI jobs don't fail just
 because the CSV changed.  Git commit/push is handled in the GitHub Workflow.
@@ -29,38 +29,79 @@ from __future__ import annotations
 
 # ── standard lib ─────────────────────────────────────────────────────────────
 import argparse
+import csv
+import hashlib
+import json
 import logging
+import math
 import os
+import random
 import re
+import signal
+import sqlite3
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, wraps
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
 from zoneinfo import ZoneInfo
 
-# ── on‑the‑fly dependency check / install ───────────────────────────────────
-for _pkg in ("requests", "beautifulsoup4", "pandas"):
-    try:
-        __import__(_pkg.split("-")[0])
-    except ImportError:  # pragma: no cover
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--quiet", _pkg])
+# ── third‑party (imported lazily where used, see --bootstrap) ───────────────
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator
+    from concurrent.futures import Executor
 
-# ── third‑party ──────────────────────────────────────────────────────────────
-import requests  # type: ignore
-from bs4 import BeautifulSoup  # type: ignore
-import pandas as pd  # type: ignore
+    import httpx  # type: ignore
+    import pandas as pd  # type: ignore
 
 # ── constants ────────────────────────────────────────────────────────────────
-URL_OVERVIEW = "https://woko.ch/en/zimmer-in-zuerich"
+REQUIREMENTS = Path(__file__).with_name("requirements.txt")
+WOKO_ORIGIN = "https://woko.ch"
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
         "(KHTML, like Gecko) Chrome/115.0 Safari/537.36"
     )
 }
+TELEGRAM_API = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 ZURICH_TZ = ZoneInfo("Europe/Zurich")
 UTC = ZoneInfo("UTC")
 
+
+@dataclass(frozen=True)
+class Region:
+    """One WOKO overview page and the href fragment of its detail links."""
+    name: str
+    url: str
+    marker: str
+
+    @classmethod
+    def from_url(cls, name: str, url: str) -> Region:
+        """``…/zimmer-in-<x>`` links its listings as ``…/zimmer-in-<x>-details/<id>``."""
+        slug = urlsplit(url).path.rstrip("/").rsplit("/", 1)[-1]
+        return cls(name, url, f"/{slug}-details/")
+
+
+REGIONS = {
+    region.name: region
+    for region in (
+        Region.from_url("zurich", f"{WOKO_ORIGIN}/en/zimmer-in-zuerich"),
+        Region.from_url("winterthur", f"{WOKO_ORIGIN}/en/zimmer-in-winterthur"),
+        Region.from_url("waedenswil", f"{WOKO_ORIGIN}/en/zimmer-in-waedenswil"),
+    )
+}
+DEFAULT_REGION = "zurich"
+
 # ── helpers ──────────────────────────────────────────────────────────────────
 
 def _env_int(name: str, default: int) -> int:
@@ -71,116 +112,2845 @@ def _env_int(name: str, default: int) -> int:
     except ValueError:
         return default
 
+
+def _env_float(name: str, default: float) -> float:
+    """Return float env‑var *name* or *default* when unset / blank / invalid."""
+    raw = (os.getenv(name) or "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+class IOStats:
+    """Bytes read from and written to disk / the network during one cycle."""
+
+    def __init__(self):
+        self.read = self.written = 0
+
+    def reset(self) -> tuple[int, int]:
+        """Return ``(read, written)`` so far and start counting from zero."""
+        totals = (self.read, self.written)
+        self.read = self.written = 0
+        return totals
+
+
+IO = IOStats()
+
+
+class StageTimer:
+    """Wall and CPU seconds per pipeline stage (fetch, parse, merge, …).
+
+    Stages running on several threads at once add up, so their sum can
+    exceed the cycle's wall time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.totals: dict[str, list[float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            with self.lock:
+                totals = self.totals.setdefault(name, [0.0, 0.0])
+                totals[0] += wall
+                totals[1] += cpu
+
+    def timed(self, name: str):
+        """Decorator form of :meth:`stage`."""
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self) -> dict[str, list[float]]:
+        """Return ``{stage: [wall, cpu]}`` so far and start from zero."""
+        with self.lock:
+            totals, self.totals = self.totals, {}
+        return totals
+
+
+STAGES = StageTimer()
+
+
+def atomic_write(path: Path, data: str | bytes) -> None:
+    """Replace *path* by *data* through a temp file, fsync and rename.
+
+    A job cancelled mid‑write leaves the old file or the new one, never a
+    truncated mix.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    tmp = _temp_path(path)
+    with tmp.open("wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    _replace(tmp, path)
+    IO.written += len(data)
+
+
+def _temp_path(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # unique per writer: enrichment threads may store the same blob at once
+    return path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _replace(tmp: Path, path: Path) -> None:
+    os.replace(tmp, path)
+    if os.name == "posix":  # make the rename itself durable
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 logging.basicConfig(
     format="[%(levelname)s] %(message)s",
     level=os.getenv("LOG_LEVEL", "INFO").upper(),
 )
+# httpx logs every request URL at INFO – Telegram's include the bot token
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+def make_client(timeout: float = 30.0, retries: int = 3, pool_size: int = 10) -> httpx.AsyncClient:
+    """Build a keep‑alive ``httpx.AsyncClient`` for scraping and alerts.
+
+    Only failed connects are retried here, for every method – nothing was
+    sent yet, so a Telegram POST is never delivered twice.  Timeouts and
+    429 / 5xx responses of WOKO GETs are left to :func:`fetch`.
+    """
+    import httpx  # type: ignore
+
+    transport = httpx.AsyncHTTPTransport(
+        retries=retries,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=pool_size),
+    )
+    return httpx.AsyncClient(headers=HEADERS, timeout=timeout, follow_redirects=True, transport=transport)
+
+
+class CircuitOpen(Exception):
+    """Raised by :func:`fetch` instead of a request while the host's breaker is open."""
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with full jitter for idempotent GETs.
+
+    Retry *n* waits a random 0…min(*cap*, *base*·2ⁿ⁻¹) seconds, or exactly
+    the server's ``Retry-After`` – unless that exceeds *cap*, in which case
+    the fetch gives up and the breaker stays open for that long instead.
+    """
+    retries: int = 3
+    base: float = 1.0
+    cap: float = 60.0
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Seconds to wait before retry *attempt* (1‑based), ``None`` to give up."""
+        if attempt > self.retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.cap else None
+        return random.uniform(0, min(self.cap, self.base * 2 ** (attempt - 1)))
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Seconds from a ``Retry-After`` header (delta‑seconds or HTTP‑date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+class CircuitBreaker:
+    """Stops requests to a host after *threshold* failed fetches in a row.
+
+    An open breaker rejects fetches for *cooldown* seconds (or the
+    ``Retry-After`` the host asked for), then lets a single probe through
+    (half‑open): success closes it, failure reopens it with the cooldown
+    doubled up to *max_cooldown* (default four times *cooldown*).  The cap is
+    kept short on purpose: a poller pays one request per poll for a down
+    host, but every second the breaker stays open past the outage is a poll
+    that would have got the page (see ``benchmarks/bench_faults.py``).
+    """
+
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(
+        self, host: str, threshold: int = 2, cooldown: float = 30.0, max_cooldown: float | None = None
+    ):
+        self.host = host
+        self.threshold, self.base_cooldown = max(1, threshold), cooldown
+        self.max_cooldown = 4 * cooldown if max_cooldown is None else max_cooldown
+        self.cooldown = cooldown
+        self.state, self.failures, self.open_until = self.CLOSED, 0, 0.0
+        self.lock = threading.Lock()
+
+    def _set(self, state: int) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(state, host=self.host)
+
+    def allow(self) -> bool:
+        """Whether a fetch may go out now; the first call after the cooldown is the probe."""
+        with self.lock:
+            if self.state == self.OPEN and time.monotonic() >= self.open_until:
+                self._set(self.HALF_OPEN)
+                logging.info("Circuit for %s half‑open – probing", self.host)
+                return True
+            return self.state == self.CLOSED
+
+    def remaining(self) -> float:
+        return max(0.0, self.open_until - time.monotonic())
+
+    def success(self) -> None:
+        with self.lock:
+            if self.state != self.CLOSED:
+                logging.info("Circuit for %s closed", self.host)
+            self.failures, self.cooldown = 0, self.base_cooldown
+            self._set(self.CLOSED)
+
+    def failure(self, hold: float | None = None) -> None:
+        """Count a failed fetch; *hold* is a ``Retry-After`` that opens the breaker at once."""
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            elif self.failures < self.threshold and hold is None:
+                return
+            pause = max(self.cooldown, hold or 0.0)
+            self.open_until = time.monotonic() + pause
+            self._set(self.OPEN)
+            logging.warning("Circuit for %s OPEN – pausing requests for %.0fs", self.host, pause)
+
+
+class CircuitBreakers:
+    """One :class:`CircuitBreaker` per host, created on first use."""
+
+    def __init__(self, threshold: int = 2, cooldown: float = 30.0, max_cooldown: float | None = None):
+        self.threshold, self.cooldown, self.max_cooldown = threshold, cooldown, max_cooldown
+        self.hosts: dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = CircuitBreaker(host, self.threshold, self.cooldown, self.max_cooldown)
+            return self.hosts[host]
+
+
+def _admit(url: str, breakers: CircuitBreakers | None) -> tuple[CircuitBreaker | None, bool]:
+    """The breaker guarding *url*'s host and whether this request is its probe.
+
+    Raises :class:`CircuitOpen` while the breaker rejects requests.
+    """
+    breaker = breakers.for_url(url) if breakers is not None else None
+    if breaker is not None and not breaker.allow():
+        raise CircuitOpen(f"circuit for {breaker.host} open for another {breaker.remaining():.0f}s")
+    return breaker, breaker is not None and breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def _retry_delay(
+    url: str,
+    attempt: int,
+    resp,
+    retryable: bool,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker | None,
+    probing: bool,
+) -> float | None:
+    """Settle one GET attempt: seconds to wait before the next, ``None`` when done.
+
+    *resp* is ``None`` when the attempt raised; *retryable* says whether that
+    error (or a 429 / 5xx reply) may be retried at all.
+    """
+    if resp is not None and resp.status_code not in RETRY_STATUSES:
+        if breaker is not None:
+            breaker.success()
+        return None
+    hold = _retry_after(resp.headers.get("Retry-After")) if resp is not None else None
+    delay = policy.backoff(attempt, hold) if retryable and not probing else None
+    if delay is None:
+        if breaker is not None:
+            breaker.failure(hold if hold is not None and hold > policy.cap else None)
+        return None
+    FETCH_RETRIES.inc(host=urlsplit(url).netloc)
+    logging.info(
+        "%s → %s – retry %d in %.1fs",
+        url, resp.status_code if resp is not None else "timeout", attempt, delay,
+    )
+    return delay
+
+
+async def fetch(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict | None = None,
+    policy: RetryPolicy | None = None,
+    breakers: CircuitBreakers | None = None,
+) -> httpx.Response:
+    """GET *url*, retrying timeouts and 429 / 5xx replies under *policy*.
+
+    Raises :class:`CircuitOpen` while the host's breaker is open; a probe of
+    a half‑open breaker is never retried.  Once retries are exhausted the
+    last error response is returned for the caller's ``raise_for_status``.
+    Any other error (a broken chunked body, a redirect loop…) is not retried
+    but still counts as a failure, so a probe always settles its breaker.
+    Backoff waits yield to the event loop.
+    """
+    import asyncio
+
+    import httpx  # type: ignore
+
+    policy = policy or RetryPolicy()
+    breaker, probing = _admit(url, breakers)
+    attempt = 0
+    while True:
+        attempt += 1
+        resp = error = None
+        try:
+            resp = await client.get(url, headers=headers)
+        except Exception as exc:
+            error = exc
+        except BaseException:  # cancelled: a probe must not leave the breaker half‑open
+            if probing:
+                breaker.failure()
+            raise
+        # failed connects were already retried by the client's transport
+        retryable = error is None or isinstance(error, httpx.TimeoutException)
+        delay = _retry_delay(url, attempt, resp, retryable, policy, breaker, probing)
+        if delay is None:
+            if error is not None:
+                raise error
+            return resp
+        await asyncio.sleep(delay)
+
+# ── metrics ──────────────────────────────────────────────────────────────────
+
+class Metric:
+    """One Prometheus metric family: a counter, gauge or histogram.
+
+    Samples are keyed by label values, passed as keyword arguments in the
+    order of *labels*; every update is O(1) and thread‑safe.
+    """
+
+    def __init__(self, kind: str, name: str, doc: str, labels: tuple = (), buckets: tuple = ()):
+        self.kind, self.name, self.doc, self.labels = kind, name, doc, labels
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.samples: dict[tuple, float | list] = {}
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.samples[key] = self.samples.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        with self.lock:
+            self.samples[self._key(labels)] = value
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            counts = self.samples.get(key)
+            if counts is None:
+                counts = self.samples[key] = [0] * len(self.buckets) + [0, 0.0]
+            for n, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[n] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            samples = sorted(self.samples.items())
+        for key, value in samples:
+            pairs = [f'{name}="{_label_value(v)}"' for name, v in zip(self.labels, key)]
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_labels(pairs)} {_number(value)}")
+                continue
+            for bound, count in zip((*self.buckets, "+Inf"), (*value[:-2], value[-2])):
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels([*pairs, le])} {count}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_number(value[-1])}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {value[-2]}")
+        return lines
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: list[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+REGISTRY: list[Metric] = []
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+FETCH_SECONDS = Metric("histogram", "woko_fetch_seconds", "Overview page fetch latency.", ("region",), LATENCY_BUCKETS)
+PARSE_SECONDS = Metric("histogram", "woko_parse_seconds", "Overview page parse time.", ("region",), FAST_BUCKETS)
+HTTP_RESPONSES = Metric("counter", "woko_http_responses_total", "Overview responses by status code.", ("region", "code"))
+FETCH_RETRIES = Metric("counter", "woko_fetch_retries_total", "GETs retried after a timeout, 429 or 5xx.", ("host",))
+CIRCUIT_STATE = Metric("gauge", "woko_circuit_state", "Circuit breaker per host: 0 closed, 1 half-open, 2 open.", ("host",))
+DOWNLOADED_BYTES = Metric("counter", "woko_downloaded_bytes_total", "Overview body bytes downloaded.", ("region",))
+LISTINGS_SEEN = Metric("gauge", "woko_listings_seen", "Listings on the last parsed overview page.", ("region",))
+LISTINGS_ACTIVE = Metric("gauge", "woko_listings_active", "ACTIVE listings in the history.")
+CHANGES = Metric("counter", "woko_changes_total", "Delta entries applied to the history.", ("kind",))
+LAST_CHANGES = Metric("gauge", "woko_last_cycle_changes", "Delta entries of the last changed cycle.", ("kind",))
+CYCLES = Metric("counter", "woko_cycles_total", "Poll cycles by outcome.", ("result",))
+CYCLE_SECONDS = Metric("histogram", "woko_cycle_seconds", "Poll cycle duration.", (), LATENCY_BUCKETS)
+LAST_SUCCESS = Metric("gauge", "woko_last_success_timestamp_seconds", "Unix time of the last cycle that did not fail.")
+ALERT_SECONDS = Metric("histogram", "woko_alert_send_seconds", "Telegram sendMessage latency.", (), LATENCY_BUCKETS)
+ALERTS = Metric("counter", "woko_alerts_total", "Telegram messages by result.", ("result",))
+POLL_INTERVAL = Metric("gauge", "woko_poll_interval_seconds", "Daemon delay until the next poll.")
+FRESHNESS_SECONDS = Metric(
+    "histogram", "woko_alert_freshness_seconds", "Time from posted_at to alert delivery.", (),
+    (60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 4 * 3600.0, 24 * 3600.0),
+)
+
+
+def serve_metrics(host: str, port: int):
+    """Serve ``/metrics`` from a daemon thread; returns the server (``.shutdown()``)."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # scrapes every few seconds would flood the log
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logging.info("Metrics served on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+# ── records ──────────────────────────────────────────────────────────────────
+
+CSV_FIELDS = ("id", "title", "posted_at", "listing_type", "link", "status", "region")
+LEGACY_FIELDS = CSV_FIELDS[:-1]  # histories written before --regions existed
+DETAIL_FIELDS = ("rent_chf", "room_size_m2", "available_from", "address")
+
+
+@dataclass(slots=True)
+class Listing:
+    """One WOKO posting; the unit the whole pipeline works on.
+
+    The detail fields are only filled by ``--enrich`` (empty string = unknown).
+    """
+    id: int
+    title: str
+    posted_at: str  # ISO‑8601, UTC
+    listing_type: str
+    link: str
+    status: str = "ACTIVE"
+    region: str = DEFAULT_REGION
+    rent_chf: str = ""
+    room_size_m2: str = ""
+    available_from: str = ""  # ISO date
+    address: str = ""
+
+    def overview_key(self) -> tuple:
+        """The fields the overview page shows – what a poll can compare."""
+        return (self.title, self.posted_at, self.listing_type, self.link, self.region)
+
+    def fingerprint(self) -> str:
+        """Stable 64‑bit hash of :meth:`overview_key` – differs iff an edit is visible."""
+        return hashlib.blake2b(
+            "\x1f".join(self.overview_key()).encode(), digest_size=8
+        ).hexdigest()
+
+    def has_details(self) -> bool:
+        return bool(self.rent_chf or self.room_size_m2 or self.available_from or self.address)
+
+
+def to_frame(listings) -> pd.DataFrame:
+    """Optional pandas view of *listings* for ad‑hoc analysis / export."""
+    import pandas as pd  # type: ignore
+
+    return pd.DataFrame(
+        [asdict(item) for item in listings], columns=CSV_FIELDS + DETAIL_FIELDS
+    )
 
 # ── scraping ─────────────────────────────────────────────────────────────────
 
-def _parse_anchor(a) -> dict | None:
-    href = a.get("href", "")
-    m_id = re.search(r"/(\d+)$", href)
+_ID_SEARCH = re.compile(r"/(\d+)$").search
+_ANCHOR_MATCH = re.compile(
+    r"(?P<title>.+?)\s+(?P<date>\d{2}\.\d{2}\.\d{4})\s+"
+    r"(?P<time>\d{2}:\d{2})\s+(?P<type>(?:Tenant|Sublet))\s+wanted",
+    flags=re.I,
+).match
+
+
+@lru_cache(maxsize=1024)
+def _posted_at_utc(date: str, clock: str) -> str:
+    """``dd.mm.yyyy`` + ``HH:MM`` Zurich wall time → ISO‑8601 UTC (memoised).
+
+    A page repeats a handful of timestamps, so strptime and the tz
+    conversion run once per distinct value; the LRU bound keeps a daemon's
+    cache from growing with the history.
+    """
+    local_dt = datetime.strptime(f"{date} {clock}", "%d.%m.%Y %H:%M").replace(tzinfo=ZURICH_TZ)
+    return local_dt.astimezone(UTC).isoformat()
+
+
+def _parse_anchor(href: str, text: str, region: str = DEFAULT_REGION) -> Listing | None:
+    """Build a Listing from a detail anchor's ``href`` and its text content."""
+    m_id = _ID_SEARCH(href)
     if not m_id:
         return None
 
-    text = " ".join(a.get_text(" ", strip=True).split())
-    m = re.search(
-        r"^(?P<title>.+?)\s+(?P<date>\d{2}\.\d{2}\.\d{4})\s+"
-        r"(?P<time>\d{2}:\d{2})\s+(?P<type>(?:Tenant|Sublet))\s+wanted",
-        text,
-        flags=re.I,
-    )
+    m = _ANCHOR_MATCH(" ".join(text.split()))
     if not m:
         return None
 
-    local_dt = datetime.strptime(
-        f"{m['date']} {m['time']}", "%d.%m.%Y %H:%M"
-    ).replace(tzinfo=ZURICH_TZ)
+    return Listing(
+        id=int(m_id.group(1)),
+        title=m["title"],
+        posted_at=_posted_at_utc(m["date"], m["time"]),
+        listing_type=m["type"].capitalize(),
+        link=href if href.startswith("http") else f"{WOKO_ORIGIN}{href}",
+        region=region,
+    )
 
-    return {
-        "id": int(m_id.group(1)),
-        "title": m["title"],
-        "posted_at": local_dt.astimezone(UTC).isoformat(),
-        "listing_type": m["type"].capitalize(),
-        "link": href if href.startswith("http") else f"https://woko.ch{href}",
-        "status": "ACTIVE",
-    }
 
+# Every backend yields ``(href, text)`` for each ``<a>`` whose href contains
+# *marker*; *text* is the anchor's text nodes joined by single spaces, i.e.
+# what ``Tag.get_text(" ")`` returns.  ``bs4`` is the reference implementation.
+
+def _anchors_bs4(html: str, marker: str):
+    from bs4 import BeautifulSoup  # type: ignore
+
+    soup = BeautifulSoup(html, "html.parser")
+    for a in soup.select(f'a[href*="{marker}"]'):
+        yield a.get("href", ""), a.get_text(" ", strip=True)
+
+
+def _anchors_lxml(html: str, marker: str):
+    import lxml.html  # type: ignore
+
+    root = lxml.html.fromstring(html)
+    for a in root.xpath("//a[contains(@href, $marker)]", marker=marker):
+        yield a.get("href", ""), " ".join(a.xpath(".//text()"))
+
+
+def _anchors_selectolax(html: str, marker: str):
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+
+    for a in LexborHTMLParser(html).css(f'a[href*="{marker}"]'):
+        yield a.attributes.get("href") or "", a.text(separator=" ", strip=True)
+
+
+def _anchors_stream(html: str, marker: str):
+    """Tokenise with the stdlib parser; only text inside detail anchors is kept."""
+    from html.parser import HTMLParser
+
+    anchors: list[tuple[str, list[str]]] = []
+
+    class _Tokenizer(HTMLParser):
+        current: list[str] | None = None
 
-def scrape_overview() -> pd.DataFrame:
-    logging.info("Fetching %s", URL_OVERVIEW)
-    resp = requests.get(URL_OVERVIEW, headers=HEADERS, timeout=30)
+        def handle_starttag(self, tag, attrs):
+            if tag == "a":
+                href = dict(attrs).get("href") or ""
+                self.current = [] if marker in href else None
+                if self.current is not None:
+                    anchors.append((href, self.current))
+
+        def handle_endtag(self, tag):
+            if tag == "a":
+                self.current = None
+
+        def handle_data(self, data):
+            if self.current is not None:
+                self.current.append(data)
+
+    tokenizer = _Tokenizer(convert_charrefs=True)
+    tokenizer.feed(html)
+    tokenizer.close()
+    for href, chunks in anchors:
+        yield href, " ".join(chunks)
+
+
+PARSERS = {
+    "bs4": _anchors_bs4,
+    "lxml": _anchors_lxml,
+    "selectolax": _anchors_selectolax,
+    "stream": _anchors_stream,
+}
+
+
+def parse_overview(
+    html: str, parser: str = "bs4", region: Region | None = None
+) -> list[Listing]:
+    """Extract listings from *region*'s overview page with the chosen *parser* backend."""
+    region = region or REGIONS[DEFAULT_REGION]
+    anchors = PARSERS[parser](html, region.marker)
+    return [
+        item
+        for item in (_parse_anchor(href, text, region.name) for href, text in anchors)
+        if item
+    ]
+
+
+def _conditional_headers(validators: dict) -> dict[str, str]:
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def _check_overview(resp, validators: dict, region: Region, elapsed: float) -> tuple[bool, dict]:
+    """Whether *resp* holds a changed page, and the validators to keep for it."""
+    FETCH_SECONDS.observe(elapsed, region=region.name)
+    HTTP_RESPONSES.inc(region=region.name, code=resp.status_code)
+    if resp.status_code == 304:
+        logging.info("%s overview not modified (304) – skipping parse", region.name)
+        return False, validators
     resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
-    anchors = soup.select('a[href*="/zimmer-in-zuerich-details/"]')
-    df = pd.DataFrame([d for d in (_parse_anchor(a) for a in anchors) if d])
-    logging.info("Scraped %d listings", len(df))
-    return df
+    # the body was downloaded whether or not it changed
+    IO.read += len(resp.content)
+    DOWNLOADED_BYTES.inc(len(resp.content), region=region.name)
+
+    fresh_validators = {
+        "etag": resp.headers.get("ETag", ""),
+        "last_modified": resp.headers.get("Last-Modified", ""),
+        "digest": hashlib.sha256(resp.content).hexdigest(),
+    }
+    if fresh_validators["digest"] == validators.get("digest"):
+        logging.info("%s overview body unchanged (digest) – skipping parse", region.name)
+        return False, fresh_validators
+    return True, fresh_validators
+
+
+def _parse_region(html: str, parser: str, region: Region) -> list[Listing]:
+    started = time.perf_counter()
+    with STAGES.stage("parse"):
+        listings = parse_overview(html, parser, region)
+    PARSE_SECONDS.observe(time.perf_counter() - started, region=region.name)
+    LISTINGS_SEEN.set(len(listings), region=region.name)
+    logging.info("Scraped %d %s listings", len(listings), region.name)
+    return listings
+
+
+async def scrape_overview(
+    client: httpx.AsyncClient,
+    validators: dict | None = None,
+    parser: str = "bs4",
+    region: Region | None = None,
+    policy: RetryPolicy | None = None,
+    breakers: CircuitBreakers | None = None,
+    executor: Executor | None = None,
+) -> tuple[list[Listing] | None, dict]:
+    """Fetch & parse *region*'s overview page, conditionally on *validators*.
+
+    Sends ``If-None-Match`` / ``If-Modified-Since`` from the previous response
+    and falls back to a SHA‑256 of the body.  Returns ``(None, validators)``
+    when the page is unchanged, so callers can skip merge, save and alerts.
+    The returned validators should only be kept once the cycle succeeded.
+    The request goes through :func:`fetch` with *policy* and *breakers*; the
+    parse runs on *executor* (the loop's default one if ``None``).
+    """
+    import asyncio
+
+    validators = validators or {}
+    region = region or REGIONS[DEFAULT_REGION]
+    logging.info("Fetching %s", region.url)
+    started = time.perf_counter()
+    with STAGES.stage("fetch"):
+        resp = await fetch(client, region.url, _conditional_headers(validators), policy, breakers)
+    changed, validators = _check_overview(resp, validators, region, time.perf_counter() - started)
+    if not changed:
+        return None, validators
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, _parse_region, resp.text, parser, region), validators
+
+
+def _region_failed(region: Region, validators: dict[str, dict], exc: Exception) -> tuple[None, dict]:
+    """A region whose fetch failed counts as unchanged and keeps its old validators."""
+    if isinstance(exc, CircuitOpen):
+        logging.info("Skipping %s – %s", region.name, exc)
+    else:
+        logging.warning("Fetching %s FAILED: %s", region.name, exc)
+    return None, validators.get(region.name, {})
+
+
+async def scrape_regions(
+    clients: list[httpx.AsyncClient],
+    regions: list[Region],
+    validators: dict[str, dict],
+    parser: str = "bs4",
+    policy: RetryPolicy | None = None,
+    breakers: CircuitBreakers | None = None,
+    executor: Executor | None = None,
+    per_client: int = 10,
+) -> dict[str, tuple[list[Listing] | None, dict]]:
+    """Run :func:`scrape_overview` for every region concurrently.
+
+    *validators* and the result are keyed by region name, so a cycle takes as
+    long as the slowest page.  A region whose fetch fails is reported as
+    unchanged (``None``) with its old validators and retried next cycle.
+    Regions are spread over *clients* in a fixed order, with at most
+    *per_client* fetches in flight on each: httpcore scans a client's whole
+    pool for every queued request, so a few small pools cost far less CPU
+    than one large one.
+    """
+    import asyncio
+
+    slots = [asyncio.Semaphore(max(1, per_client)) for _ in clients]
+
+    async def scrape(n: int, region: Region):
+        client, slot = clients[n % len(clients)], slots[n % len(clients)]
+        try:
+            async with slot:
+                return await scrape_overview(
+                    client, validators.get(region.name), parser, region, policy, breakers, executor
+                )
+        except Exception as exc:
+            return _region_failed(region, validators, exc)
+
+    pages = await asyncio.gather(*(scrape(n, region) for n, region in enumerate(regions)))
+    return {region.name: page for region, page in zip(regions, pages)}
+
+
+def load_validators(path: Path) -> dict[str, dict]:
+    """Read per‑region HTTP validators persisted by a previous run (``{}`` if none)."""
+    try:
+        raw = path.read_bytes()
+        validators = json.loads(raw)
+    except (OSError, ValueError):
+        return {}
+    IO.read += len(raw)
+    # files from before --regions held one flat record; a full fetch replaces it
+    return validators if all(isinstance(v, dict) for v in validators.values()) else {}
+
+
+def save_validators(validators: dict, path: Path) -> None:
+    atomic_write(path, json.dumps(validators, indent=2))
 
 # ── persistence ─────────────────────────────────────────────────────────────
 
-def merge_history(new_df: pd.DataFrame, csv_path: Path) -> pd.DataFrame:
-    if csv_path.exists():
-        old_df = pd.read_csv(csv_path, dtype={"id": int})
-        vanished = old_df[~old_df["id"].isin(new_df["id"])].copy()
-        if not vanished.empty:
-            vanished["status"] = "INACTIVE"
-            new_df = pd.concat([new_df, vanished], ignore_index=True)
-    return new_df.sort_values("posted_at", ascending=False).reset_index(drop=True)
+def load_history(csv_path: Path) -> dict[int, Listing] | None:
+    """Read the CSV history keyed by ID, or ``None`` when it does not exist yet."""
+    if not csv_path.exists():
+        return None
+    IO.read += csv_path.stat().st_size
+    with csv_path.open(newline="") as fh:
+        rows = csv.reader(fh)
+        header = tuple(next(rows, CSV_FIELDS))
+        if header in (LEGACY_FIELDS, LEGACY_FIELDS + DETAIL_FIELDS):
+            legacy = len(LEGACY_FIELDS)
+            rows = (row[:legacy] + [DEFAULT_REGION] + row[legacy:] for row in rows)
+        elif header not in (CSV_FIELDS, CSV_FIELDS + DETAIL_FIELDS):
+            raise ValueError(f"{csv_path}: unexpected header {header}")
+        history = {}
+        intern = sys.intern  # type / status / region: a handful of values each
+        for row in rows:
+            listing_id = int(row[0])
+            row[3], row[5], row[6] = intern(row[3]), intern(row[5]), intern(row[6])
+            history[listing_id] = Listing(listing_id, *row[1:])
+        return history
+
+
+@STAGES.timed("merge")
+def merge_history(
+    live: list[Listing], history: dict[int, Listing] | None
+) -> list[Listing]:
+    """Live listings plus vanished history rows (as INACTIVE), newest first.
+
+    Detail fields already in the history are carried over to live rows.
+    """
+    merged = list(live)
+    if history:
+        live_ids = set()
+        for n, item in enumerate(merged):
+            live_ids.add(item.id)
+            old = history.get(item.id)
+            if old is not None and old.has_details() and not item.has_details():
+                merged[n] = _with_details(item, old)
+        merged += [
+            item if item.status == "INACTIVE" else _with_status(item, "INACTIVE")
+            for listing_id, item in history.items()
+            if listing_id not in live_ids
+        ]
+    # equal timestamps fall back to the ID, as in SqliteStore.listings()
+    return sorted(merged, key=_newest_first, reverse=True)
+
+
+def _newest_first(item: Listing) -> tuple[str, int]:
+    return item.posted_at, item.id
+
+
+def _with_status(item: Listing, status: str) -> Listing:
+    return Listing(
+        item.id, item.title, item.posted_at, item.listing_type, item.link, status,
+        item.region, item.rent_chf, item.room_size_m2, item.available_from, item.address,
+    )
+
+
+def _with_details(item: Listing, details: Listing) -> Listing:
+    return Listing(
+        item.id, item.title, item.posted_at, item.listing_type, item.link, item.status,
+        item.region, details.rent_chf, details.room_size_m2, details.available_from, details.address,
+    )
+
 
+def _csv_cell(value: str) -> str:
+    """Quote *value* the way ``csv.QUOTE_MINIMAL`` (and pandas) would."""
+    # four substring scans beat one regex search on these short cells
+    if '"' in value or "," in value or "\n" in value or "\r" in value:
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
-def save_if_changed(df: pd.DataFrame, path: Path) -> bool:
-    csv_text = df.to_csv(index=False)
-    if path.exists() and path.read_text() == csv_text:
+
+def _csv_lines(listings: list[Listing]) -> Iterator[str]:
+    """Serialise *listings* line by line exactly like ``DataFrame.to_csv(index=False)``.
+
+    The detail columns are only written once some listing has been enriched,
+    so the plain scrape keeps its compact layout.
+    """
+    cell = _csv_cell
+    detailed = any(item.has_details() for item in listings)
+    yield ",".join(CSV_FIELDS + DETAIL_FIELDS if detailed else CSV_FIELDS) + "\n"
+    for item in listings:
+        yield (
+            f"{item.id},{cell(item.title)},{cell(item.posted_at)},{cell(item.listing_type)},"
+            f"{cell(item.link)},{cell(item.status)},{cell(item.region)}"
+            + (
+                f",{cell(item.rent_chf)},{cell(item.room_size_m2)},"
+                f"{cell(item.available_from)},{cell(item.address)}\n"
+                if detailed else "\n"
+            )
+        )
+
+
+def _csv_chunks(listings: list[Listing], rows: int = 1024) -> Iterator[str]:
+    """The CSV in chunks of *rows* lines – never the whole file at once."""
+    lines = _csv_lines(listings)
+    while chunk := "".join(islice(lines, rows)):
+        yield chunk
+
+
+def render_csv(listings: list[Listing]) -> str:
+    """The CSV of *listings* as one string (see :func:`_csv_lines`)."""
+    return "".join(_csv_lines(listings))
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + ".sha256")
+
+
+def _current_digest(path: Path, size: int) -> str | None:
+    """SHA‑256 of *path* as last written, ``None`` if it cannot match *size* bytes.
+
+    The sidecar records the digest with the file's size and mtime; only a
+    file changed behind our back (git checkout, an editor) is read and hashed.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if st.st_size != size:
+        return None
+    try:
+        digest, stored_size, mtime_ns = _digest_path(path).read_text().split()
+        if int(stored_size) == st.st_size and int(mtime_ns) == st.st_mtime_ns:
+            return digest
+    except (OSError, ValueError):
+        pass
+    body = path.read_bytes()
+    IO.read += len(body)
+    digest = hashlib.sha256(body).hexdigest()
+    _store_digest(path, digest)
+    return digest
+
+
+def _store_digest(path: Path, digest: str) -> None:
+    st = path.stat()
+    atomic_write(_digest_path(path), f"{digest} {st.st_size} {st.st_mtime_ns}\n")
+
+
+@STAGES.timed("save")
+def save_if_changed(listings: list[Listing], path: Path) -> bool:
+    """Atomically write *listings* to *path* unless the content is unchanged.
+
+    The CSV is streamed into the temp file and hashed on the way, so the full
+    text is never held in memory; an unchanged render is dropped unsynced.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    tmp = _temp_path(path)
+    with tmp.open("wb") as fh:
+        for text in _csv_chunks(listings):
+            chunk = text.encode()
+            fh.write(chunk)
+            hasher.update(chunk)
+            size += len(chunk)
+        digest = hasher.hexdigest()
+        unchanged = _current_digest(path, size) == digest
+        if not unchanged:
+            fh.flush()
+            os.fsync(fh.fileno())
+    if unchanged:
+        tmp.unlink()
         logging.info("CSV unchanged – nothing to write")
         return False
-    path.write_text(csv_text)
-    logging.info("CSV written → %s", path)
+    _replace(tmp, path)
+    IO.written += size
+    _store_digest(path, digest)
+    logging.info("CSV written → %s (%d B)", path, size)
     return True
 
-# ── alerts ──────────────────────────────────────────────────────────────────
+# ── history stores ──────────────────────────────────────────────────────────
 
-def telegram_alerts(df: pd.DataFrame, fresh_minutes: int) -> None:
-    token, chat_id = os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
-    if not (token and chat_id):
-        logging.debug("Telegram secrets not set – skipping alerts")
-        return
+@dataclass
+class Delta:
+    """What one poll changed relative to the stored history."""
+    new: list[Listing] = field(default_factory=list)
+    reappeared: list[Listing] = field(default_factory=list)
+    vanished: list[int] = field(default_factory=list)
+    updated: list[Listing] = field(default_factory=list)
+    before: dict[int, Listing] = field(default_factory=dict)  # stored rows of *updated*
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.reappeared or self.vanished or self.updated)
 
-    now = datetime.now(UTC)
-    since = now - timedelta(minutes=fresh_minutes)
-    fresh = df[ pd.to_datetime(df["posted_at"], utc=True) >= since ]
-    # fresh = df[(df["listing_type"] == "Tenant") & (pd.to_datetime(df["posted_at"], utc=True) >= since)]
-    for _, row in fresh.iterrows():
-        msg = (
-            "URGENT: NEW RENT POSTING ON WOKO\n\n"
-            f"TITLE: {row.title}\nTYPE: {row.listing_type} \nTIMESTAMP: {row.posted_at}\nLINK: {row.link}"
+    def __str__(self) -> str:
+        return (
+            f"{len(self.new)} new, {len(self.reappeared)} reappeared, "
+            f"{len(self.vanished)} vanished, {len(self.updated)} updated"
         )
-        try:
-            requests.post(
-                f"https://api.telegram.org/bot{token}/sendMessage",
-                data={"chat_id": chat_id, "text": msg},
-                timeout=20,
-            ).raise_for_status()
-            logging.info("Telegram alert sent for ID %s", row.id)
-        except Exception as exc:
-            logging.warning("Telegram alert FAILED for %s: %s", row.id, exc)
 
-# ── CLI ─────────────────────────────────────────────────────────────────────
 
-def main(argv: list[str] | None = None) -> None:
-    p = argparse.ArgumentParser(description="Scrape WOKO listings & update CSV history")
-    p.add_argument("--csv", type=Path, default="data/woko_listings.csv", help="Output CSV path (default data/woko_listings.csv)")
-    p.add_argument("--fresh-window", type=int, default=_env_int("TIME_WINDOW_MINUTES", 5), help="Fresh window minutes (default 5 or TIME_WINDOW_MINUTES env)")
-    args = p.parse_args(argv)
+def diff_history(
+    live: list[Listing], known: dict[int, tuple[str, str]], active: set[int]
+) -> Delta:
+    """Compare *live* with the stored ``(status, fingerprint)`` of the same IDs
+    (*known*) and the set of IDs currently ACTIVE – O(page + active), never
+    O(history).  An edit costs one hash comparison per ID."""
+    delta = Delta()
+    for item in live:
+        old = known.get(item.id)
+        if old is None:
+            delta.new.append(item)
+        elif old[0] != "ACTIVE":
+            delta.reappeared.append(item)
+        elif old[1] != item.fingerprint():
+            delta.updated.append(item)
+    live_ids = {item.id for item in live}
+    delta.vanished = sorted(active - live_ids)
+    return delta
 
-    live_df = scrape_overview()
-    combo_df = merge_history(live_df, args.csv)
-    changed = save_if_changed(combo_df, args.csv)
 
-    telegram_alerts(live_df, args.fresh_window)
+class CsvStore:
+    """The historical behaviour: whole history in memory, CSV rewritten on change."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.history: dict[int, Listing] | None = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def _loaded(self) -> dict[int, Listing]:
+        if self.history is None:
+            self.history = load_history(self.path) or {}
+        return self.history
+
+    def ids(self) -> set[int]:
+        return set(self._loaded())
+
+    def lookup(self, ids) -> dict[int, Listing]:
+        history = self._loaded()
+        return {i: history[i] for i in ids if i in history}
+
+    def fingerprints(self, ids) -> dict[int, tuple[str, str]]:
+        """``(status, fingerprint)`` per known ID; the CSV keeps no hash column,
+        so the handful asked for per poll are hashed on the fly."""
+        history = self._loaded()
+        return {
+            i: (history[i].status, history[i].fingerprint()) for i in ids if i in history
+        }
+
+    def active_ids(self) -> set[int]:
+        return {i for i, item in self._loaded().items() if item.status == "ACTIVE"}
+
+    def apply(self, live: list[Listing], delta: Delta) -> bool:
+        if not delta:
+            return False
+        merged = merge_history(live, self._loaded())
+        changed = save_if_changed(merged, self.path)
+        self.history = {item.id: item for item in merged}
+        return changed
+
+    def set_details(self, details: dict[int, dict[str, str]]) -> bool:
+        history = self._loaded()
+        for listing_id, fields in details.items():
+            if listing_id in history:
+                for name, value in fields.items():
+                    setattr(history[listing_id], name, value)
+        return save_if_changed(self.listings(), self.path)
+
+    def listings(self) -> list[Listing]:
+        return sorted(self._loaded().values(), key=_newest_first, reverse=True)
+
+
+class SqliteStore:
+    """Indexed SQLite history keyed on ``id`` that only ever applies deltas.
+
+    New IDs are inserted, vanished ones flipped to INACTIVE, reappeared and
+    edited ones rewritten – so a cycle costs O(changes) plus one indexed
+    lookup of the live IDs.  An empty database is seeded from *seed_csv*.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS listings (
+            id           INTEGER PRIMARY KEY,
+            title        TEXT NOT NULL,
+            posted_at    TEXT NOT NULL,
+            listing_type TEXT NOT NULL,
+            link         TEXT NOT NULL,
+            status       TEXT NOT NULL,
+            region       TEXT NOT NULL DEFAULT 'zurich',
+            rent_chf       TEXT NOT NULL DEFAULT '',
+            room_size_m2   TEXT NOT NULL DEFAULT '',
+            available_from TEXT NOT NULL DEFAULT '',
+            address        TEXT NOT NULL DEFAULT '',
+            fingerprint    TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS listings_status ON listings (status);
+        CREATE INDEX IF NOT EXISTS listings_posted_at ON listings (posted_at);
+    """
+    COLUMNS = ", ".join(CSV_FIELDS + DETAIL_FIELDS)
+    INSERT_COLUMNS = COLUMNS + ", fingerprint"
+    MARKS = ", ".join("?" * (len(CSV_FIELDS + DETAIL_FIELDS) + 1))
+
+    def __init__(self, path: Path, seed_csv: Path | None = None):
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(self.SCHEMA)
+        present = {row[1] for row in self.db.execute("PRAGMA table_info(listings)")}
+        if "region" not in present:  # databases created before --regions existed
+            self.db.execute(
+                f"ALTER TABLE listings ADD COLUMN region TEXT NOT NULL DEFAULT '{DEFAULT_REGION}'"
+            )
+        for name in DETAIL_FIELDS:  # databases created before --enrich existed
+            if name not in present:
+                self.db.execute(f"ALTER TABLE listings ADD COLUMN {name} TEXT NOT NULL DEFAULT ''")
+        if "fingerprint" not in present:  # … and before row fingerprints
+            with self.db:
+                self.db.execute("ALTER TABLE listings ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''")
+                self.db.executemany(
+                    "UPDATE listings SET fingerprint = ? WHERE id = ?",
+                    [(item.fingerprint(), item.id) for item in self.listings()],
+                )
+        self._active: set[int] | None = None
+        if seed_csv and seed_csv.exists() and not self.db.execute(
+            "SELECT 1 FROM listings LIMIT 1"
+        ).fetchone():
+            rows = (load_history(seed_csv) or {}).values()
+            with self.db:
+                self.db.executemany(
+                    f"INSERT INTO listings ({self.INSERT_COLUMNS}) VALUES ({self.MARKS})",
+                    (self._row(item) for item in rows),
+                )
+            logging.info("SQLite history seeded from %s", seed_csv)
+
+    @staticmethod
+    def _row(item: Listing) -> tuple:
+        return (
+            item.id, item.title, item.posted_at, item.listing_type, item.link, item.status,
+            item.region, item.rent_chf, item.room_size_m2, item.available_from, item.address,
+            item.fingerprint(),
+        )
+
+    def exists(self) -> bool:
+        return self.db.execute("SELECT 1 FROM listings LIMIT 1").fetchone() is not None
+
+    def ids(self) -> set[int]:
+        return {row[0] for row in self.db.execute("SELECT id FROM listings")}
+
+    def lookup(self, ids) -> dict[int, Listing]:
+        ids = list(ids)
+        found: dict[int, Listing] = {}
+        for start in range(0, len(ids), 500):  # stay below SQLITE_MAX_VARIABLE_NUMBER
+            chunk = ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            for row in self.db.execute(
+                f"SELECT {self.COLUMNS} FROM listings WHERE id IN ({marks})", chunk
+            ):
+                found[row[0]] = Listing(*row)
+        return found
+
+    def fingerprints(self, ids) -> dict[int, tuple[str, str]]:
+        """``(status, fingerprint)`` per known ID – a narrow primary‑key read."""
+        ids = list(ids)
+        found: dict[int, tuple[str, str]] = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            for listing_id, status, fingerprint in self.db.execute(
+                f"SELECT id, status, fingerprint FROM listings WHERE id IN ({marks})", chunk
+            ):
+                found[listing_id] = (status, fingerprint)
+        return found
+
+    def active_ids(self) -> set[int]:
+        if self._active is None:
+            self._active = {
+                row[0] for row in self.db.execute("SELECT id FROM listings WHERE status = 'ACTIVE'")
+            }
+        return set(self._active)
+
+    @STAGES.timed("save")
+    def apply(self, live: list[Listing], delta: Delta) -> bool:
+        if not delta:
+            return False
+        active = self.active_ids()
+        with self.db:
+            # upsert only the overview columns so enrichment results survive
+            self.db.executemany(
+                f"INSERT INTO listings ({self.INSERT_COLUMNS}) VALUES ({self.MARKS}) "
+                "ON CONFLICT (id) DO UPDATE SET title = excluded.title, "
+                "posted_at = excluded.posted_at, listing_type = excluded.listing_type, "
+                "link = excluded.link, status = excluded.status, region = excluded.region, "
+                "fingerprint = excluded.fingerprint",
+                (self._row(item) for item in (*delta.new, *delta.reappeared, *delta.updated)),
+            )
+            self.db.executemany(
+                "UPDATE listings SET status = 'INACTIVE' WHERE id = ?",
+                ((i,) for i in delta.vanished),
+            )
+        active.update(item.id for item in (*delta.new, *delta.reappeared))
+        active.difference_update(delta.vanished)
+        self._active = active
+        logging.info("SQLite history updated → %s", self.path)
+        return True
+
+    def set_details(self, details: dict[int, dict[str, str]]) -> bool:
+        with self.db:
+            for listing_id, fields in details.items():
+                assignments = ", ".join(f"{name} = ?" for name in fields)
+                self.db.execute(
+                    f"UPDATE listings SET {assignments} WHERE id = ?",
+                    (*fields.values(), listing_id),
+                )
+        return bool(details)
+
+    def listings(self) -> list[Listing]:
+        return [
+            Listing(*row)
+            for row in self.db.execute(
+                f"SELECT {self.COLUMNS} FROM listings ORDER BY posted_at DESC, id DESC"
+            )
+        ]
+
+
+# ── change events ───────────────────────────────────────────────────────────
+
+class EventLog:
+    """Append‑only JSONL log of what each poll changed, with consumer cursors.
+
+    One line per event: ``{"at", "event", "id", "listing"}`` where *event* is
+    NEW, REAPPEARED, CHANGED or VANISHED (the latter without ``listing``);
+    CHANGED events also carry ``"changes": {field: [old, new]}``.
+    Consumers read from a byte offset kept in ``<log>.cursors.json``, so
+    catching up costs O(events since the last read), never O(history).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.cursor_path = path.with_suffix(".cursors.json")
+        try:
+            self.cursors: dict[str, int] = json.loads(self.cursor_path.read_text())
+        except (OSError, ValueError):
+            self.cursors = {}
+
+    @STAGES.timed("save")
+    def append(self, delta: Delta) -> int:
+        """Write one event per entry of *delta*; returns the number written."""
+        stamp = datetime.now(UTC).isoformat(timespec="milliseconds")
+        lines = [
+            json.dumps({"at": stamp, "event": kind, "id": item.id, "listing": _event_payload(item)})
+            for kind, items in (("NEW", delta.new), ("REAPPEARED", delta.reappeared))
+            for item in items
+        ]
+        lines += [
+            json.dumps({
+                "at": stamp, "event": "CHANGED", "id": item.id, "listing": _event_payload(item),
+                "changes": _changes(delta.before.get(item.id), item),
+            })
+            for item in delta.updated
+        ]
+        lines += [
+            json.dumps({"at": stamp, "event": "VANISHED", "id": listing_id})
+            for listing_id in delta.vanished
+        ]
+        if lines:
+            self._write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def append_details(self, details: dict[int, dict[str, str]]) -> int:
+        """Write one DETAILS event per enriched listing (journal store only)."""
+        stamp = datetime.now(UTC).isoformat(timespec="milliseconds")
+        data = "".join(
+            json.dumps({"at": stamp, "event": "DETAILS", "id": listing_id, "details": fields}) + "\n"
+            for listing_id, fields in details.items()
+        )
+        if data:
+            self._write(data)
+        return len(details)
+
+    def _write(self, data: str) -> None:
+        """Append *data*, first dropping a half‑written last line, which the
+        new events would otherwise extend into one unparseable line."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab+") as fh:
+            end = fh.seek(0, os.SEEK_END)
+            if end:
+                fh.seek(end - 1)
+                if fh.read(1) != b"\n":
+                    logging.warning("Dropping a half‑written last line of %s", self.path)
+                    fh.truncate(_line_start(fh, end))
+            fh.write(data.encode())
+        IO.written += len(data)
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def tail(self, consumer: str):
+        """Yield ``(event, end_offset)`` for events *consumer* has not committed."""
+        offset = self.cursors.get(consumer, 0)
+        try:
+            fh = self.path.open("rb")
+        except FileNotFoundError:
+            return
+        with fh:
+            if offset > os.fstat(fh.fileno()).st_size:  # log was replaced
+                offset = 0
+            elif offset:
+                fh.seek(offset - 1)
+                if fh.read(1) != b"\n":  # cursor from before an interrupted trim
+                    offset = 0
+            fh.seek(offset)
+            for line in fh:
+                if not line.endswith(b"\n"):  # half‑written by an interrupted run
+                    return
+                offset += len(line)
+                IO.read += len(line)
+                if line.strip():
+                    yield json.loads(line), offset
+
+    def commit(self, consumer: str, offset: int) -> None:
+        """Mark everything before *offset* as consumed by *consumer*."""
+        if self.cursors.get(consumer) == offset:
+            return
+        self.cursors[consumer] = offset
+        atomic_write(self.cursor_path, json.dumps(self.cursors, indent=2))
+
+    def trim(self, min_share: float = 0.0) -> int:
+        """Drop the events every consumer has committed, once they make up at
+        least *min_share* of the log; returns the bytes removed.
+
+        Cursors are rewritten first: an interruption in between at worst makes
+        consumers re‑read events, which they all tolerate.
+        """
+        cut = min(self.cursors.values(), default=0)
+        if cut <= 0 or cut < min_share * self.size():
+            return 0
+        with self.path.open("rb") as fh:
+            fh.seek(cut)
+            rest = fh.read()
+        IO.read += len(rest)
+        self.cursors = {name: offset - cut for name, offset in self.cursors.items()}
+        atomic_write(self.cursor_path, json.dumps(self.cursors, indent=2))
+        atomic_write(self.path, rest)
+        return cut
+
+
+def _line_start(fh, end: int, chunk: int = 8192) -> int:
+    """Offset just past the last newline before *end* in binary *fh* (0 if none)."""
+    pos = end
+    while pos > 0:
+        step = min(pos, chunk)
+        pos -= step
+        fh.seek(pos)
+        newline = fh.read(step).rfind(b"\n")
+        if newline >= 0:
+            return pos + newline + 1
+    return 0
+
+
+def _event_payload(item: Listing) -> dict[str, str]:
+    return {name: getattr(item, name) for name in CSV_FIELDS[1:]}
+
+
+def _changes(old: Listing | None, new: Listing) -> dict[str, list[str]]:
+    """``{field: [old, new]}`` for the overview fields an edit touched."""
+    if old is None:
+        return {}
+    return {
+        name: [getattr(old, name), getattr(new, name)]
+        for name in ("title", "posted_at", "listing_type", "link", "region")
+        if getattr(old, name) != getattr(new, name)
+    }
+
+
+def _event_listing(event: dict) -> Listing:
+    return Listing(event["id"], **event["listing"])
+
+
+class JournalStore(CsvStore):
+    """CSV snapshot plus the event log as an append‑only journal.
+
+    A poll only appends its delta to the event log (which ``run_cycle`` writes
+    anyway), so a committed change is a few JSON lines instead of a rewritten,
+    re‑sorted CSV.  The history is the snapshot with the journal replayed from
+    the ``snapshot`` cursor; :meth:`fold` writes it back to the CSV.
+    """
+
+    def __init__(self, path: Path, events: EventLog):
+        super().__init__(path)
+        self.events = events
+        # until the first fold the whole log is journal: nothing may be trimmed
+        events.cursors.setdefault("snapshot", 0)
+
+    def exists(self) -> bool:
+        return self.path.exists() or self.events.size() > 0
+
+    def _loaded(self) -> dict[int, Listing]:
+        if self.history is None:
+            history = load_history(self.path) or {}
+            for event, _ in self.events.tail("snapshot"):
+                _replay(history, event)
+            self.history = history
+        return self.history
+
+    def apply(self, live: list[Listing], delta: Delta) -> bool:
+        """Apply *delta* in memory; the event log already holds it on disk."""
+        if not delta:
+            return False
+        history = self._loaded()
+        for item in (*delta.new, *delta.reappeared, *delta.updated):
+            old = history.get(item.id)
+            history[item.id] = _with_details(item, old) if old is not None else item
+        for listing_id in delta.vanished:
+            history[listing_id] = _with_status(history[listing_id], "INACTIVE")
+        return True
+
+    def set_details(self, details: dict[int, dict[str, str]]) -> bool:
+        history = self._loaded()
+        for listing_id, fields in details.items():
+            if listing_id in history:
+                for name, value in fields.items():
+                    setattr(history[listing_id], name, value)
+        return self.events.append_details(details) > 0
+
+    def fold(self) -> bool:
+        """Write the replayed history to the CSV snapshot and move the cursor."""
+        end = self.events.size()
+        changed = save_if_changed(self.listings(), self.path)
+        self.events.commit("snapshot", end)
+        return changed
+
+
+def _replay(history: dict[int, Listing], event: dict) -> None:
+    """Apply one journal *event* to *history* (idempotent, so re‑reads are safe)."""
+    listing_id, kind = event["id"], event["event"]
+    old = history.get(listing_id)
+    if kind in ("NEW", "REAPPEARED", "CHANGED"):
+        item = _event_listing(event)
+        history[listing_id] = _with_details(item, old) if old is not None else item
+    elif kind == "VANISHED" and old is not None:
+        history[listing_id] = _with_status(old, "INACTIVE")
+    elif kind == "DETAILS" and old is not None:
+        for name, value in event["details"].items():
+            setattr(old, name, value)
+
+
+def open_store(
+    args: argparse.Namespace, events: EventLog
+) -> CsvStore | SqliteStore | JournalStore:
+    if args.store == "sqlite":
+        return SqliteStore(args.db, seed_csv=args.csv)
+    if args.store == "journal":
+        return JournalStore(args.csv, events)
+    return CsvStore(args.csv)
+
+
+def compact(args: argparse.Namespace) -> None:
+    """Fold the journal into the CSV snapshot and drop consumed events."""
+    events = EventLog(args.events)
+    _fold(open_store(args, events), events)
+
+
+def _fold(store: JournalStore, events: EventLog) -> None:
+    before = events.size()
+    store.fold()
+    removed = events.trim()
+    logging.info(
+        "Journal compacted – %d B folded into %s, %d B kept for pending consumers",
+        removed, store.path, before - removed,
+    )
+
+
+def compact_if_due(store: CsvStore | SqliteStore | JournalStore, events: EventLog, days: float) -> bool:
+    """Fold a journal whose oldest unfolded event is *days* old; returns whether it did.
+
+    Lets the poll that would otherwise race a separate compaction job do it.
+    """
+    if days <= 0 or not isinstance(store, JournalStore):
+        return False
+    pending = events.tail("snapshot")
+    oldest = next(pending, None)
+    pending.close()
+    if oldest is None or datetime.now(UTC) - datetime.fromisoformat(oldest[0]["at"]) < timedelta(days=days):
+        return False
+    _fold(store, events)
+    return True
+
+# ── columnar export ─────────────────────────────────────────────────────────
+
+PARQUET_MANIFEST = "_manifest.json"
+
+
+def _parquet_schema():
+    import pyarrow as pa  # type: ignore
+
+    category = pa.dictionary(pa.int8(), pa.string())
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("posted_at", pa.timestamp("ms", tz="Europe/Zurich")),
+        ("listing_type", category),
+        ("link", pa.string()),
+        ("status", category),
+        ("region", category),
+        ("rent_chf", pa.int32()),
+        ("room_size_m2", pa.float32()),
+        ("available_from", pa.date32()),
+        ("address", pa.string()),
+    ])
+
+
+def _posted_month(item: Listing) -> str:
+    """``YYYY-MM`` of the posting in Zurich time, as WOKO shows it."""
+    return datetime.fromisoformat(item.posted_at).astimezone(ZURICH_TZ).strftime("%Y-%m")
+
+
+def _parquet_table(rows: list[Listing]):
+    import pyarrow as pa  # type: ignore
+
+    def number(value: str, cast):
+        try:
+            return cast(value) if value else None
+        except ValueError:
+            return None
+
+    def day(value: str):
+        try:
+            return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+        except ValueError:
+            return None
+
+    columns = {
+        "id": [item.id for item in rows],
+        "title": [item.title for item in rows],
+        "posted_at": [datetime.fromisoformat(item.posted_at) for item in rows],
+        "listing_type": [item.listing_type for item in rows],
+        "link": [item.link for item in rows],
+        "status": [item.status for item in rows],
+        "region": [item.region for item in rows],
+        "rent_chf": [number(item.rent_chf, int) for item in rows],
+        "room_size_m2": [number(item.room_size_m2, float) for item in rows],
+        "available_from": [day(item.available_from) for item in rows],
+        "address": [item.address or None for item in rows],
+    }
+    schema = _parquet_schema()
+    return pa.Table.from_pydict(
+        {name: pa.array(values, type=schema.field(name).type)
+         for name, values in columns.items()},
+        schema=schema,
+    )
+
+
+def export_parquet(listings: list[Listing], root: Path) -> tuple[int, int]:
+    """Write *listings* as Parquet under ``root/posted_month=YYYY-MM/``.
+
+    Columns are typed (int id, Zurich timestamp, dictionary‑encoded categories,
+    numeric rent / size, date availability), so a query reads only the
+    columns and months it needs.  Months are Zurich months – the ones the
+    poll schedule and WOKO itself use – so a listing posted just after local
+    midnight on the 1st lands in the new month, not in the UTC one before.  ``_manifest.json`` keeps a digest per
+    month; only months whose rows changed are rewritten, empty ones removed.
+    Returns ``(partitions written, partitions total)``.
+    """
+    import io
+
+    import pyarrow.parquet as pq  # type: ignore
+
+    months: dict[str, list[Listing]] = {}
+    for item in listings:
+        months.setdefault(_posted_month(item), []).append(item)
+    manifest_path = root / PARQUET_MANIFEST
+    try:
+        manifest: dict[str, str] = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    written = 0
+    for month, rows in sorted(months.items()):
+        rows.sort(key=_newest_first, reverse=True)
+        digest = hashlib.sha256(render_csv(rows).encode()).hexdigest()
+        target = root / f"posted_month={month}" / "part-0.parquet"
+        if manifest.get(month) == digest and target.exists():
+            continue
+        buffer = io.BytesIO()
+        pq.write_table(_parquet_table(rows), buffer, compression="zstd")
+        atomic_write(target, buffer.getvalue())
+        manifest[month] = digest
+        written += 1
+    for month in set(manifest) - set(months):
+        (root / f"posted_month={month}" / "part-0.parquet").unlink(missing_ok=True)
+        del manifest[month]
+    atomic_write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    logging.info("Parquet export → %s – %d of %d partition(s) rewritten", root, written, len(months))
+    return written, len(months)
+
+# ── detail enrichment ───────────────────────────────────────────────────────
+
+_DETAIL_LABELS = (
+    ("rent_chf", re.compile(r"\b(rent|miete|mietzins|price|preis)\b", re.I)),
+    ("room_size_m2", re.compile(r"size|gr(ö|oe?)sse|fl(ä|ae)che|m2|m²", re.I)),
+    ("available_from", re.compile(r"available|free (as )?of|frei ab|bezug|move.in", re.I)),
+    ("address", re.compile(r"address|adresse", re.I)),
+)
+_NUMBER = re.compile(r"\d[\d'’ ]*(?:[.,]\d+)?")
+_DATE = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{4})")
+
+
+def _normalise_detail(name: str, value: str) -> str:
+    if name in ("rent_chf", "room_size_m2"):
+        m = _NUMBER.search(value)
+        if not m:
+            return ""
+        number = re.sub(r"['’ ]", "", m.group()).replace(",", ".")
+        return number.split(".")[0] if name == "rent_chf" else number
+    if name == "available_from":
+        m = _DATE.search(value)
+        return f"{m[3]}-{int(m[2]):02d}-{int(m[1]):02d}" if m else value
+    return value
+
+
+# bump when parse_detail's output changes: cached bodies are then re‑parsed
+# on their next lookup instead of being fetched again
+DETAIL_PARSER_VERSION = 1
+
+
+def parse_detail(html: str) -> dict[str, str]:
+    """Pull rent, room size, availability and address out of a detail page.
+
+    Detail pages are label / value tables (``<tr><td>Miete</td><td>…``) or
+    definition lists; labels are matched in English and German and the first
+    match per field wins.
+    """
+    from html.parser import HTMLParser
+
+    pairs: list[tuple[str, str]] = []
+
+    class _Cells(HTMLParser):
+        def __init__(self):
+            super().__init__(convert_charrefs=True)
+            self.cells: list[list[str]] = []
+            self.cell: list[str] | None = None
+
+        def handle_starttag(self, tag, attrs):
+            if tag in ("tr", "dt"):
+                self.cells = []
+            if tag in ("td", "th", "dt", "dd"):
+                self.cell = []
+                self.cells.append(self.cell)
+
+        def handle_endtag(self, tag):
+            if tag in ("td", "th", "dt", "dd"):
+                self.cell = None
+            if tag in ("tr", "dd") and len(self.cells) >= 2:
+                label, value = (" ".join(" ".join(c).split()) for c in self.cells[:2])
+                pairs.append((label, value))
+                self.cells = []
+
+        def handle_data(self, data):
+            if self.cell is not None:
+                self.cell.append(data)
+
+    parser = _Cells()
+    parser.feed(html)
+    parser.close()
+
+    details: dict[str, str] = {}
+    for label, value in pairs:
+        for name, pattern in _DETAIL_LABELS:
+            if name not in details and pattern.search(label):
+                details[name] = _normalise_detail(name, value)
+                break
+    return {name: value for name, value in details.items() if value}
+
+
+class DetailCache:
+    """Content‑addressed on‑disk cache of detail pages, keyed by listing ID.
+
+    Bodies are stored once per SHA‑256 under *root*; ``index.json`` maps each
+    ID to its digest, ETag / Last‑Modified, parsed details (with the
+    :data:`DETAIL_PARSER_VERSION` that produced them) and timestamps.
+    Entries younger than *ttl* seconds are served without a request; older
+    ones are revalidated with a conditional GET and only re‑parsed when the
+    body digest or the parser changed.  ``flush()`` evicts least recently
+    used entries until the bodies fit in *max_bytes* and persists the index.
+    """
+
+    def __init__(self, root: Path, ttl: float = 86400.0, max_bytes: int = 50 * 2**20):
+        self.root, self.ttl, self.max_bytes = root, ttl, max_bytes
+        self.index_path = root / "index.json"
+        try:
+            self.entries: dict[str, dict] = json.loads(self.index_path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+        self.lock = threading.Lock()
+        self.dirty = False
+
+    def get(self, listing_id: int) -> dict | None:
+        with self.lock:
+            entry = self.entries.get(str(listing_id))
+            if entry is not None:
+                entry["accessed_at"] = time.time()
+                self.dirty = True
+            return entry
+
+    def is_stale(self, listing_id: int) -> bool:
+        entry = self.entries.get(str(listing_id))
+        return entry is None or time.time() - entry["fetched_at"] > self.ttl
+
+    def touch(self, listing_id: int) -> None:
+        """Record a successful revalidation (304 or identical body)."""
+        with self.lock:
+            self.entries[str(listing_id)]["fetched_at"] = time.time()
+            self.dirty = True
+
+    def body(self, digest: str) -> bytes | None:
+        """The stored body with SHA‑256 *digest*, if it is still on disk."""
+        with self.lock:
+            try:
+                return (self.root / f"{digest}.html").read_bytes()
+            except OSError:
+                return None
+
+    def reparsed(self, listing_id: int, details: dict) -> None:
+        """Store *details* re‑parsed from the cached body by the current parser."""
+        with self.lock:
+            entry = self.entries[str(listing_id)]
+            entry["details"], entry["parser"] = details, DETAIL_PARSER_VERSION
+            self.dirty = True
+
+    def put(self, listing_id: int, body: bytes, digest: str, headers, details: dict) -> None:
+        now = time.time()
+        # write and register under one lock, or a concurrent flush() could
+        # delete the body before its index entry exists
+        with self.lock:
+            blob = self.root / f"{digest}.html"
+            if not blob.exists():
+                atomic_write(blob, body)
+            self.entries[str(listing_id)] = {
+                "sha256": digest,
+                "size": len(body),
+                "etag": headers.get("ETag", ""),
+                "last_modified": headers.get("Last-Modified", ""),
+                "details": details,
+                "parser": DETAIL_PARSER_VERSION,
+                "fetched_at": now,
+                "accessed_at": now,
+            }
+            self.dirty = True
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            blobs: dict[str, int] = {}
+            for entry in self.entries.values():
+                blobs[entry["sha256"]] = entry["size"]
+            total = sum(blobs.values())
+            for key, entry in sorted(self.entries.items(), key=lambda kv: kv[1]["accessed_at"]):
+                if total <= self.max_bytes:
+                    break
+                del self.entries[key]
+                if all(e["sha256"] != entry["sha256"] for e in self.entries.values()):
+                    total -= blobs.pop(entry["sha256"])
+            for blob in self.root.glob("*.html"):
+                if blob.stem not in blobs:
+                    blob.unlink()
+            atomic_write(self.index_path, json.dumps(self.entries))
+            self.dirty = False
+
+
+class DetailEnricher:
+    """Fetches detail pages for listings without blocking the alert path.
+
+    Every fetch is a task on the running loop over *client*: at most
+    *workers* requests are in flight, per host at most *per_host* at once,
+    and a token bucket caps the request rate at *host_rate* per second.
+    Responses are checked and parsed on *executor*.  Every fetch goes
+    through *cache*, so a steady‑state cycle makes no detail requests at
+    all.  ``pending`` maps listing IDs to their task; :meth:`drain` waits
+    for all of them, :meth:`collect` returns the finished ones on the loop
+    thread, which owns the history store.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache: DetailCache,
+        executor: Executor | None = None,
+        workers: int = 4,
+        per_host: int = 2,
+        host_rate: float = 2.0,
+        policy: RetryPolicy | None = None,
+        breakers: CircuitBreakers | None = None,
+    ):
+        import asyncio
+
+        self.client, self.cache, self.executor = client, cache, executor
+        self.policy, self.breakers = policy, breakers
+        self.per_host, self.host_rate = max(1, per_host), host_rate
+        self.in_flight = asyncio.Semaphore(max(1, workers))
+        self.hosts: dict[str, tuple] = {}
+        self.lock = threading.Lock()  # stats are also counted on the executor
+        self.pending: dict = {}
+        self.stats = {"cached": 0, "not_modified": 0, "parsed": 0, "reparsed": 0}
+
+    def _host(self, url: str) -> tuple:
+        """``(slots, bucket)`` for *url*'s host."""
+        import asyncio
+
+        host = urlsplit(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = (asyncio.Semaphore(self.per_host), TokenBucket(self.host_rate, self.per_host))
+        return self.hosts[host]
+
+    def _count(self, outcome: str) -> None:
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def _lookup(self, item: Listing, revalidate: bool) -> tuple[dict | None, bool]:
+        """The cache entry for *item* and whether it can be used without a request.
+
+        Details from an older :func:`parse_detail` are re‑parsed from the
+        cached body first; without that body the entry is ignored.
+        """
+        entry = self.cache.get(item.id)
+        if entry is not None and entry.get("parser") != DETAIL_PARSER_VERSION:
+            body = self.cache.body(entry["sha256"])
+            if body is None:
+                return None, False
+            self.cache.reparsed(item.id, parse_detail(body.decode("utf-8", "replace")))
+            self._count("reparsed")
+        if entry is not None and not revalidate and not self.cache.is_stale(item.id):
+            self._count("cached")
+            return entry, True
+        return entry, False
+
+    def _accept(self, item: Listing, entry: dict | None, resp) -> dict[str, str]:
+        """Details from a detail‑page response, re‑parsed only if the body changed."""
+        if resp.status_code == 304 and entry is not None:
+            self.cache.touch(item.id)
+            self._count("not_modified")
+            return entry["details"]
+        resp.raise_for_status()
+
+        digest = hashlib.sha256(resp.content).hexdigest()
+        if entry is not None and entry["sha256"] == digest:
+            self.cache.touch(item.id)
+            self._count("not_modified")
+            return entry["details"]
+        details = parse_detail(resp.text)
+        self.cache.put(item.id, resp.content, digest, resp.headers, details)
+        self._count("parsed")
+        return details
+
+    def _wanted(self, live: list[Listing], delta: Delta):
+        """``(item, revalidate)`` for every listing to fetch that is not pending yet."""
+        edited = {item.id for item in delta.updated}
+        wanted = edited | {item.id for item in (*delta.new, *delta.reappeared)}
+        for item in live:
+            if item.id in self.pending:
+                continue
+            if item.id in wanted or self.cache.is_stale(item.id):
+                yield item, item.id in edited
+
+    async def _fetch(self, item: Listing, revalidate: bool) -> dict[str, str]:
+        import asyncio
+
+        entry, fresh = self._lookup(item, revalidate)
+        if fresh:
+            return entry["details"]
+        slots, bucket = self._host(item.link)
+        async with self.in_flight, slots:
+            await bucket.acquire()
+            resp = await fetch(
+                self.client, item.link, _conditional_headers(entry or {}), self.policy, self.breakers
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._accept, item, entry, resp)
+
+    def submit(self, live: list[Listing], delta: Delta) -> None:
+        """Queue new, reappeared and edited listings plus live ones whose
+        cache entry expired; INACTIVE listings are never fetched."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        for item, revalidate in self._wanted(live, delta):
+            self.pending[item.id] = loop.create_task(self._fetch(item, revalidate))
+
+    async def drain(self) -> None:
+        """Wait for every pending fetch; ``collect()`` then returns them all."""
+        import asyncio
+
+        if self.pending:
+            await asyncio.wait(list(self.pending.values()))
+
+    def collect(self) -> dict[int, dict[str, str]]:
+        """Return details of finished fetches."""
+        results: dict[int, dict[str, str]] = {}
+        for listing_id, fut in list(self.pending.items()):
+            if not fut.done():
+                continue
+            del self.pending[listing_id]
+            try:
+                details = fut.result()
+                results[listing_id] = {name: details.get(name, "") for name in DETAIL_FIELDS}
+            except Exception as exc:
+                logging.warning("Detail fetch FAILED for %s: %s", listing_id, exc)
+        self.cache.flush()
+        return results
+
+
+    def close(self) -> None:
+        for task in self.pending.values():
+            task.cancel()
+        self.cache.flush()
+
+
+def apply_enrichment(state: State) -> None:
+    """Move finished detail fetches that change something into the store."""
+    if state.enricher is None:
+        return
+    results = state.enricher.collect()
+    known = state.store.lookup(results)
+    changed = {
+        listing_id: details
+        for listing_id, details in results.items()
+        if listing_id in known
+        and any(getattr(known[listing_id], name) != value for name, value in details.items())
+    }
+    if changed:
+        state.store.set_details(changed)
+        logging.info("Enriched %d listing(s) with detail-page fields", len(changed))
+    if results:
+        logging.info("Detail pages: %s", ", ".join(f"{n} {k}" for k, n in state.enricher.stats.items()))
+
+# ── alerts ──────────────────────────────────────────────────────────────────
+
+TELEGRAM_MAX_CHARS = 4096
+
+
+class TokenBucket:
+    """Thread‑safe token bucket: *rate* tokens per second, up to *burst*."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate, self.burst = rate, max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> float:
+        """Take a token if one is available (→ 0), else return the seconds to wait."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait, yielding to the event loop, until one token is available, then take it."""
+        import asyncio
+
+        while (wait := self.take()) > 0:
+            await asyncio.sleep(wait)
+
+
+class AlertDispatcher:
+    """Sends Telegram messages concurrently within a per‑chat rate limit.
+
+    Each message is a task on the running loop over *client*, at most
+    *workers* in flight; every send first takes a token from the bucket.  A
+    429 reply is retried once after the ``retry_after`` Telegram asks for.
+    The token bucket lives as long as the dispatcher, so the per‑chat limit
+    also holds across daemon cycles.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token: str,
+        chat_id: str,
+        workers: int = 4,
+        rate: float = 1.0,
+        burst: int = 20,
+        digest_threshold: int = 10,
+    ):
+        self.client, self.token, self.chat_id = client, token, chat_id
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate, burst)
+        self.digest_threshold = digest_threshold
+
+    def _request(self, text: str) -> tuple[str, dict[str, str]]:
+        """URL and form data of one ``sendMessage`` call."""
+        return f"{TELEGRAM_API}/bot{self.token}/sendMessage", {"chat_id": self.chat_id, "text": text}
+
+    @staticmethod
+    def _rate_limited(resp) -> float:
+        """Seconds a 429 reply asks to wait before the retry."""
+        try:
+            delay = float(resp.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            delay = 1.0
+        logging.info("Telegram rate limit hit – retrying in %.1fs", delay)
+        return delay
+
+    @staticmethod
+    def _outcome(ids: list, exc: Exception | None, delivered: set) -> None:
+        """Count one batch; *ids* are listing IDs or ``(id, fingerprint)`` update keys."""
+        listing_ids = ", ".join(str(i[0] if isinstance(i, tuple) else i) for i in ids)
+        if exc is None:
+            delivered.update(ids)
+            ALERTS.inc(result="sent")
+            logging.info("Telegram alert sent for ID %s", listing_ids)
+        else:
+            logging.warning("Telegram alert FAILED for ID %s: %s", listing_ids, exc)
+            ALERTS.inc(result="failed")
+
+    async def _send(self, text: str) -> None:
+        import asyncio
+
+        url, data = self._request(text)
+        for attempt in (1, 2):
+            await self.bucket.acquire()
+            started = time.perf_counter()
+            resp = await self.client.post(url, data=data)
+            ALERT_SECONDS.observe(time.perf_counter() - started)
+            if resp.status_code == 429 and attempt == 1:
+                await asyncio.sleep(self._rate_limited(resp))
+                continue
+            resp.raise_for_status()
+            return
+
+    async def dispatch(self, batches: list[tuple[list[int], str]]) -> set[int]:
+        """Send every ``(ids, text)`` batch; return the IDs that were delivered."""
+        import asyncio
+
+        delivered: set[int] = set()
+        if not batches:
+            return delivered
+        started = time.monotonic()
+        slots = asyncio.Semaphore(min(self.workers, len(batches)))
+
+        async def send(ids: list[int], text: str) -> None:
+            async with slots:
+                try:
+                    await self._send(text)
+                except Exception as exc:
+                    self._outcome(ids, exc, delivered)
+                    return
+            self._outcome(ids, None, delivered)
+
+        await asyncio.gather(*(send(ids, text) for ids, text in batches))
+        logging.info(
+            "Dispatched %d/%d message(s) in %.2fs",
+            sum(1 for ids, _ in batches if set(ids) <= delivered),
+            len(batches),
+            time.monotonic() - started,
+        )
+        return delivered
+
+
+def _format_alert(row) -> str:
+    return (
+        "URGENT: NEW RENT POSTING ON WOKO\n\n"
+        f"TITLE: {row.title}\nTYPE: {row.listing_type} \nREGION: {row.region}\nTIMESTAMP: {row.posted_at}\nLINK: {row.link}"
+    )
+
+
+def _format_update(row, changes: dict[str, list[str]]) -> str:
+    lines = "\n".join(f"{name.upper()}: {old} → {new}" for name, (old, new) in changes.items())
+    return (
+        "UPDATED RENT POSTING ON WOKO\n\n"
+        f"TITLE: {row.title}\nLINK: {row.link}\n\n{lines}"
+    )
+
+
+def _format_digests(rows: list) -> list[tuple[list[int], str]]:
+    """Pack *rows* into as few digest messages as Telegram's size limit allows."""
+    batches: list[tuple[list[int], str]] = []
+    ids: list[int] = []
+    text = ""
+    for row in rows:
+        entry = f"\n\n{row.title} ({row.listing_type}, {row.region}, {row.posted_at})\n{row.link}"
+        if ids and len(text) + len(entry) > TELEGRAM_MAX_CHARS - 64:
+            batches.append((ids, text))
+            ids, text = [], ""
+        ids.append(row.id)
+        text += entry
+    if ids:
+        batches.append((ids, text))
+    return [
+        (ids, f"URGENT: {len(ids)} NEW RENT POSTINGS ON WOKO{text}") for ids, text in batches
+    ]
+
+
+class AlertLedger:
+    """Append‑only JSONL record of alerted listing IDs with an in‑memory set.
+
+    Each line is ``{"id": …, "alerted_at": …}``; IDs seeded without an alert
+    carry ``"alerted_at": null``.  Alerted IDs also record ``posted_at`` and
+    ``first_seen_at`` (when a poll first found them) for :func:`latency_report`.
+    A delivered update alert is a line with the listing's new ``fingerprint``.
+    Membership checks are O(1).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.ids: set[int] = set()
+        self.updates: set[tuple[int, str]] = set()
+        self.is_new = not path.exists()
+        if not self.is_new:
+            IO.read += path.stat().st_size
+            complete = 0
+            with path.open("rb") as fh:
+                for line in fh:
+                    if not line.endswith(b"\n"):  # half‑written by an interrupted run
+                        break
+                    complete += len(line)
+                    if line.strip():
+                        entry = json.loads(line)
+                        if "fingerprint" in entry:
+                            self.updates.add((int(entry["id"]), entry["fingerprint"]))
+                        else:
+                            self.ids.add(int(entry["id"]))
+            if complete < path.stat().st_size:  # drop it, or the next append extends it
+                logging.warning("Dropping a half‑written last line of %s", path)
+                os.truncate(path, complete)
+
+    def __contains__(self, listing_id: int) -> bool:
+        return listing_id in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def record(self, ids, alerted: bool = True, seen: dict[int, tuple[str, str]] | None = None) -> None:
+        """Append *ids* that are not in the ledger yet.
+
+        *seen* maps an ID to its ``(posted_at, first_seen_at)``.
+        """
+        ids = [i for i in dict.fromkeys(int(i) for i in ids) if i not in self.ids]
+        if not ids and not self.is_new:
+            return
+        now = datetime.now(UTC)
+        stamp = now.isoformat(timespec="milliseconds") if alerted else None
+        seen = seen or {}
+        lines = []
+        for i in ids:
+            entry = {"id": i, "alerted_at": stamp}
+            if alerted and i in seen:
+                entry["posted_at"], entry["first_seen_at"] = seen[i]
+                FRESHNESS_SECONDS.observe((now - datetime.fromisoformat(seen[i][0])).total_seconds())
+            lines.append(json.dumps(entry) + "\n")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(lines)
+        with self.path.open("a") as fh:
+            fh.write(data)
+        IO.written += len(data)
+        self.ids.update(ids)
+        self.is_new = False
+
+    def record_updates(self, keys) -> None:
+        """Append delivered ``(id, fingerprint)`` update alerts not in the ledger yet."""
+        keys = [key for key in dict.fromkeys(keys) if key not in self.updates]
+        if not keys:
+            return
+        stamp = datetime.now(UTC).isoformat(timespec="milliseconds")
+        data = "".join(
+            json.dumps({"id": i, "fingerprint": fingerprint, "alerted_at": stamp}) + "\n"
+            for i, fingerprint in keys
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as fh:
+            fh.write(data)
+        IO.written += len(data)
+        self.updates.update(keys)
+
+
+def _update_key(event: dict) -> tuple[int, str]:
+    """A CHANGED event's alert key: the listing ID and its new fingerprint."""
+    return event["id"], _event_listing(event).fingerprint()
+
+
+def _alert_plan(events: EventLog, dispatcher, ledger: AlertLedger, updates: bool):
+    """Pending ``telegram`` events with the message batches for new listings
+    and for updates, or ``None`` (cursor advanced) without a dispatcher."""
+    pending = list(events.tail("telegram"))
+    if dispatcher is None:
+        logging.debug("Telegram secrets not set – skipping alerts")
+        if pending:
+            events.commit("telegram", pending[-1][1])
+        return None
+
+    rows = list({
+        event["id"]: _event_listing(event)
+        for event, _ in pending
+        if event["event"] == "NEW" and event["id"] not in ledger
+    }.values())
+    if 0 < dispatcher.digest_threshold < len(rows):
+        batches = _format_digests(rows)
+    else:
+        batches = [([row.id], _format_alert(row)) for row in rows]
+    # update alerts are keyed by (ID, new fingerprint): replays skip sent ones
+    update_batches = [
+        ([key], _format_update(_event_listing(event), event.get("changes", {})))
+        for key, event in {
+            _update_key(event): event
+            for event, _ in pending
+            if updates and event["event"] == "CHANGED"
+        }.items()
+        if key not in ledger.updates
+    ]
+    return pending, batches, update_batches
+
+
+def _alert_settle(
+    events: EventLog,
+    ledger: AlertLedger,
+    pending: list,
+    delivered: set[int],
+    sent_updates: set[tuple[int, str]],
+    updates: bool,
+) -> None:
+    """Record delivered alerts and advance the cursor to the first undelivered event."""
+    if delivered:
+        seen = {
+            event["id"]: (event["listing"]["posted_at"], event["at"])
+            for event, _ in reversed(pending)  # the earliest NEW event wins
+            if event["event"] == "NEW"
+        }
+        ledger.record(delivered, seen=seen)
+    ledger.record_updates(sent_updates)
+    consumed = events.cursors.get("telegram", 0)
+    for event, end in pending:
+        if event["event"] == "NEW" and event["id"] not in ledger:
+            break
+        if updates and event["event"] == "CHANGED" and _update_key(event) not in ledger.updates:
+            break
+        consumed = end
+    events.commit("telegram", consumed)
+
+
+async def telegram_alerts(
+    events: EventLog,
+    dispatcher: AlertDispatcher | None,
+    ledger: AlertLedger,
+    updates: bool = False,
+) -> None:
+    """Alert once for every NEW event since the last call whose ID is not in *ledger*.
+
+    Delivered IDs are recorded in the ledger and the ``telegram`` cursor
+    advances up to the first undelivered event, which is retried on the next
+    poll.  More than ``dispatcher.digest_threshold`` listings are merged into
+    digest messages instead of one message each (a threshold of 0 disables
+    digests).  With *updates*, every CHANGED event is sent as well, one
+    message each, after the new listings.
+    """
+    with STAGES.stage("alerts"):
+        plan = _alert_plan(events, dispatcher, ledger, updates)
+        if plan is None:
+            return
+        pending, batches, update_batches = plan
+        delivered = await dispatcher.dispatch(batches)
+        sent_updates = await dispatcher.dispatch(update_batches)
+        _alert_settle(events, ledger, pending, delivered, sent_updates, updates)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Linearly interpolated *q*‑quantile (0…1) of sorted *values*."""
+    pos = (len(values) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def latency_report(ledger_path: Path) -> dict[str, dict[str, float]]:
+    """p50 / p95 / p99 seconds over every ledger entry that carries timings.
+
+    ``detect`` is posted_at → first seen by a poll, ``deliver`` first seen →
+    alert sent and ``total`` posted_at → alert sent.  Poll and alert times
+    carry milliseconds, but WOKO shows minutes only, so ``detect`` and
+    ``total`` are accurate to about a minute.
+    """
+    spans: dict[str, list[float]] = {"detect": [], "deliver": [], "total": []}
+    try:
+        fh = ledger_path.open()
+    except FileNotFoundError:
+        return {}
+    with fh:
+        for line in fh:
+            entry = json.loads(line) if line.strip() else {}
+            if not (entry.get("alerted_at") and entry.get("first_seen_at")):
+                continue
+            posted, seen, alerted = (
+                datetime.fromisoformat(entry[key])
+                for key in ("posted_at", "first_seen_at", "alerted_at")
+            )
+            spans["detect"].append((seen - posted).total_seconds())
+            spans["deliver"].append((alerted - seen).total_seconds())
+            spans["total"].append((alerted - posted).total_seconds())
+    report = {}
+    for name, values in spans.items():
+        if values:
+            values.sort()
+            report[name] = {"count": len(values)} | {
+                f"p{round(q * 100)}": _percentile(values, q) for q in (0.5, 0.95, 0.99)
+            }
+    return report
+
+
+def print_latency_report(ledger_path: Path) -> None:
+    report = latency_report(ledger_path)
+    if not report:
+        print(f"No alert timings in {ledger_path} yet")
+        return
+    print(f"time to alert from {ledger_path} (seconds)")
+    print(f"  {'span':<8} {'alerts':>6} {'p50':>12} {'p95':>12} {'p99':>12}")
+    for name, row in report.items():
+        print(f"  {name:<8} {row['count']:6d} {row['p50']:12.3f} {row['p95']:12.3f} {row['p99']:12.3f}")
+
+# ── profiling ───────────────────────────────────────────────────────────────
+
+def log_profile(stages: dict[str, list[float]], wall: float, read: int, written: int) -> None:
+    """One grep‑able ``PROFILE {json}`` line with the cycle's stage timings."""
+    record = {
+        "cycle_ms": round(wall * 1000, 1),
+        "stages": {
+            name: {"wall_ms": round(w * 1000, 1), "cpu_ms": round(c * 1000, 1)}
+            for name, (w, c) in stages.items()
+        },
+        "read_bytes": read,
+        "written_bytes": written,
+    }
+    logging.info("PROFILE %s", json.dumps(record, separators=(",", ":")))
+
+
+def warm_imports(parser: str) -> None:
+    """Import the third‑party modules a poll needs, timed as the ``import`` stage."""
+    with STAGES.stage("import"):
+        import httpx  # type: ignore  # noqa: F401
+
+        list(PARSERS[parser]("<a href='-'></a>", "-"))  # backends import lazily
+
+
+class StackSampler(threading.Thread):
+    """Samples every thread's stack each *interval* seconds.
+
+    :meth:`dump` writes collapsed stacks (``outer;…;inner count``), the input
+    of flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.counts: dict[str, int] = {}
+        self.halt = threading.Event()
+
+    def run(self) -> None:
+        me = threading.get_ident()
+        while not self.halt.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def dump(self, path: Path) -> None:
+        self.halt.set()
+        self.join()
+        atomic_write(path, "".join(f"{stack} {n}\n" for stack, n in sorted(self.counts.items())))
+        logging.info("Collapsed stacks (%d samples) → %s", sum(self.counts.values()), path)
+
+# ── scheduling ──────────────────────────────────────────────────────────────
+
+class PollSchedule:
+    """Daemon poll intervals per Zurich weekday × hour, learned from ``posted_at``.
+
+    A listing posted in a slot waits half that slot's interval on average
+    before a poll finds it, so the expected wait over a week is
+    Σ λ·τ / 2 for posting rate λ and interval τ.  For a fixed number of polls
+    that is smallest when each slot gets polls ∝ √λ.  Intervals are clamped to
+    [*min_interval*, *max_interval*] and the polls this frees or costs are
+    spread over the remaining slots.
+    """
+
+    SLOTS = 7 * 24
+
+    def __init__(self, rates: list[float], budget: float, min_interval: float, max_interval: float):
+        self.rates = rates
+        self.budget = budget  # polls per day
+        self.intervals = self._allocate(rates, budget * 7, min_interval, max_interval)
+
+    @classmethod
+    def from_history(cls, listings, budget: float, min_interval: float, max_interval: float) -> PollSchedule:
+        """Posting counts per slot, shrunk towards the hour‑of‑day profile.
+
+        The shrinkage and a uniform floor keep a short history from leaving a
+        slot with no polls at all.
+        """
+        counts = [0] * cls.SLOTS
+        for item in listings:
+            local = datetime.fromisoformat(item.posted_at).astimezone(ZURICH_TZ)
+            counts[local.weekday() * 24 + local.hour] += 1
+        hourly = [sum(counts[hour::24]) for hour in range(24)]
+        rates = [count + hourly[slot % 24] / 7 + 1 / 24 for slot, count in enumerate(counts)]
+        return cls(rates, budget, min_interval, max_interval)
+
+    @staticmethod
+    def _allocate(rates: list[float], polls: float, low: float, high: float) -> list[float]:
+        weights = [math.sqrt(rate) for rate in rates]
+        intervals: dict[int, float] = {}
+        free = list(range(len(rates)))
+        while free:
+            total = sum(weights[slot] for slot in free)
+            wanted = {
+                slot: 3600 * total / (polls * weights[slot]) if polls > 0 else high
+                for slot in free
+            }
+            clamped = {
+                slot: min(max(interval, low), high)
+                for slot, interval in wanted.items()
+                if not low <= interval <= high
+            }
+            if not clamped:
+                intervals.update(wanted)
+                break
+            intervals.update(clamped)
+            polls -= sum(3600 / interval for interval in clamped.values())
+            free = [slot for slot in free if slot not in clamped]
+        return [intervals[slot] for slot in range(len(rates))]
+
+    def slot(self, now: datetime) -> int:
+        local = now.astimezone(ZURICH_TZ)
+        return local.weekday() * 24 + local.hour
+
+    def delay(self, now: datetime) -> float:
+        """Seconds from *now* to the next poll – at most one interval into a busier next hour."""
+        slot = self.slot(now)
+        local = now.astimezone(ZURICH_TZ)
+        to_next_hour = 3600 - (local.minute * 60 + local.second + local.microsecond / 1e6)
+        return min(self.intervals[slot], to_next_hour + self.intervals[(slot + 1) % self.SLOTS])
+
+    def polls_per_day(self) -> float:
+        return sum(3600 / interval for interval in self.intervals) / 7
+
+    def expected_wait(self, intervals: list[float] | None = None) -> float:
+        """Mean seconds from posting to the next poll, weighted by posting rate."""
+        intervals = intervals or self.intervals
+        return sum(r * i / 2 for r, i in zip(self.rates, intervals)) / sum(self.rates)
+
+
+def learn_schedule(args: argparse.Namespace, store) -> PollSchedule:
+    budget = args.poll_budget or 86400 / args.interval
+    schedule = PollSchedule.from_history(
+        store.listings(), budget, args.min_interval, args.max_interval
+    )
+    fixed = [86400 / budget] * PollSchedule.SLOTS
+    logging.info(
+        "Adaptive schedule – %.0f polls/day, every %.0f–%.0fs, expected detection %.0fs (fixed: %.0fs)",
+        schedule.polls_per_day(), min(schedule.intervals), max(schedule.intervals),
+        schedule.expected_wait(), schedule.expected_wait(fixed),
+    )
+    return schedule
+
+# ── run loop ────────────────────────────────────────────────────────────────
+
+@dataclass
+class State:
+    """Everything worth keeping warm between daemon cycles."""
+    client: httpx.AsyncClient | None = None  # Telegram and detail pages
+    shards: list[httpx.AsyncClient] = field(default_factory=list)  # overview fetches
+    executor: Executor | None = None  # parses off the loop thread
+    store: CsvStore | SqliteStore | JournalStore | None = None
+    validators: dict[str, dict] = field(default_factory=dict)
+    ledger: AlertLedger | None = None
+    events: EventLog | None = None
+    dispatcher: AlertDispatcher | None = None
+    enricher: DetailEnricher | None = None
+    policy: RetryPolicy = field(default_factory=RetryPolicy)
+    breakers: CircuitBreakers = field(default_factory=CircuitBreakers)
+    schedule: PollSchedule | None = None
+    learned_at: float = 0.0
+
+
+async def run_cycle(args: argparse.Namespace, state: State) -> bool:
+    """One fetch → diff → store → alert pass; returns whether the history changed.
+
+    Store, event log and ledger work stays on the loop thread – SQLite
+    connections are bound to the thread that opened them – and is local
+    disk I/O of a few milliseconds.
+    """
+    IO.reset()
+    started = time.perf_counter()
+    result = "failed"
+    try:
+        _prepare(args, state)
+        pages = await scrape_regions(
+            state.shards, args.regions, state.validators, args.parser,
+            state.policy, state.breakers, state.executor, args.http_pool_size,
+        )
+        recorded = _record(args, state, pages)
+        await telegram_alerts(state.events, state.dispatcher, state.ledger, args.alert_updates)
+        if not compact_if_due(state.store, state.events, args.compact_after):
+            # halving keeps each rewrite proportional to the events consumed since the last one
+            state.events.trim(0.5)
+        changed = _finish(state, pages, recorded)
+        result = "changed" if changed else "unchanged"
+        LAST_SUCCESS.set(time.time())
+        return changed
+    finally:
+        _account(args, state, result, started)
+
+
+def _account(args: argparse.Namespace, state: State, result: str, started: float) -> None:
+    """Per‑cycle metrics, the I/O line and – with ``--profile`` – the PROFILE line."""
+    CYCLES.inc(result=result)
+    CYCLE_SECONDS.observe(time.perf_counter() - started)
+    read, written = IO.reset()
+    try:
+        history = state.store.path.stat().st_size
+    except (AttributeError, OSError):
+        history = 0
+    logging.info("I/O – history %d B, read %d B, wrote %d B", history, read, written)
+    stages = STAGES.reset()
+    if args.profile:
+        log_profile(stages, time.perf_counter() - started, read, written)
+
+
+def _validators_path(state: State) -> Path:
+    return state.store.path.with_suffix(".http.json")
+
+
+def _prepare(args: argparse.Namespace, state: State) -> None:
+    """Open the event log, store and ledger on first use; apply finished enrichment."""
+    if state.events is None:
+        state.events = EventLog(args.events)
+    if state.store is None:
+        state.store = open_store(args, state.events)
+    if state.ledger is None:
+        # validators are meaningless without the history they were applied to
+        state.validators = load_validators(_validators_path(state)) if state.store.exists() else {}
+        state.ledger = AlertLedger(args.ledger)
+    apply_enrichment(state)
+
+
+def _record(
+    args: argparse.Namespace, state: State, pages: dict[str, tuple[list[Listing] | None, dict]]
+) -> tuple[bool, list[Listing], Delta] | None:
+    """Diff the changed pages against the store and append / apply the delta.
+
+    Returns ``(changed, live, delta)``, or ``None`` when no page changed.
+    """
+    changed_regions = {name for name, (listings, _) in pages.items() if listings is not None}
+    if not changed_regions:
+        return None
+
+    # the history is only consulted once a page changed – no‑op polls stay cheap
+    with STAGES.stage("merge"):
+        live = [item for listings, _ in pages.values() if listings is not None for item in listings]
+        # unchanged (or unconfigured) regions keep their ACTIVE rows as they are
+        live += [
+            item
+            for item in state.store.lookup(state.store.active_ids()).values()
+            if item.region not in changed_regions
+        ]
+        known = state.store.fingerprints(item.id for item in live)
+        delta = diff_history(live, known, state.store.active_ids())
+        if delta.updated:
+            delta.before = state.store.lookup(item.id for item in delta.updated)
+    logging.info("Delta: %s", delta)
+    for kind in ("new", "reappeared", "vanished", "updated"):
+        count = len(getattr(delta, kind))
+        CHANGES.inc(count, kind=kind)
+        LAST_CHANGES.set(count, kind=kind)
+
+    if state.ledger.is_new:
+        known_ids = state.store.ids() or {item.id for item in live}
+        if known_ids:  # an empty seed would let the first real page flood the chat
+            state.ledger.record(known_ids, alerted=False)
+            logging.info("Alert ledger seeded with %d known IDs → %s", len(state.ledger), args.ledger)
+
+    state.events.append(delta)
+    changed = state.store.apply(live, delta)
+    LISTINGS_ACTIVE.set(len(state.store.active_ids()))
+    return changed, live, delta
+
+
+def _finish(
+    state: State,
+    pages: dict[str, tuple[list[Listing] | None, dict]],
+    recorded: tuple[bool, list[Listing], Delta] | None,
+) -> bool:
+    """After the alerts: queue enrichment and keep the new validators."""
+    validators = {name: page_validators for name, (_, page_validators) in pages.items()}
+    state.validators = validators
+    if recorded is None:
+        return False
+    changed, live, delta = recorded
+    if state.enricher is not None:
+        state.enricher.submit(live, delta)  # after alerts: enrichment never delays them
+    save_validators(validators, _validators_path(state))
+    return changed
+
+
+def _daemon_banner(args: argparse.Namespace) -> None:
+    if args.schedule == "adaptive":
+        logging.info("Daemon started – adaptive schedule")
+    else:
+        logging.info("Daemon started – polling every %.1fs", args.interval)
+
+
+def _next_interval(args: argparse.Namespace, state: State, started: float, now: datetime) -> float:
+    """Seconds between the cycle that started at *started* (monotonic) / *now*
+    and the next one; the adaptive schedule is (re)learned once a day."""
+    if args.schedule == "adaptive" and state.store is not None and (
+        state.schedule is None or started - state.learned_at >= 86400
+    ):
+        try:
+            state.schedule, state.learned_at = learn_schedule(args, state.store), started
+        except Exception as exc:
+            logging.warning("Schedule not learned: %s", exc)
+    interval = state.schedule.delay(now) if state.schedule is not None else args.interval
+    POLL_INTERVAL.set(interval)
+    return interval
+
+
+async def run_daemon(args: argparse.Namespace, state: State) -> None:
+    """Poll every ``args.interval`` seconds – or per the adaptive schedule,
+    relearned daily – until SIGINT / SIGTERM; detail fetches keep running
+    between polls."""
+    import asyncio
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    _daemon_banner(args)
+    while not stop.is_set():
+        started, now = time.monotonic(), datetime.now(UTC)
+        try:
+            changed = await run_cycle(args, state)
+            logging.info(
+                "Cycle done in %.3fs – changed=%s", time.monotonic() - started, changed
+            )
+        except Exception as exc:
+            logging.warning("Cycle FAILED: %s", exc)
+        interval = _next_interval(args, state, started, now)
+        try:
+            await asyncio.wait_for(stop.wait(), max(0.0, interval - (time.monotonic() - started)))
+        except asyncio.TimeoutError:
+            pass
+    logging.info("Daemon stopped")
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def bootstrap() -> None:
+    """Install the third‑party dependencies into the running interpreter."""
+    cmd = [sys.executable, "-m", "pip", "install", "--quiet", "-r", str(REQUIREMENTS)]
+    logging.info("Bootstrapping dependencies: %s", " ".join(cmd))
+    subprocess.check_call(cmd)
+
+
+def parse_regions(spec: str) -> list[Region]:
+    """``zurich,winterthur`` or ``name=https://woko.ch/en/zimmer-in-…`` entries."""
+    regions: dict[str, Region] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, url = entry.partition("=")
+        name = name.strip().lower()
+        if url:
+            regions[name] = Region.from_url(name, url.strip())
+        elif name in REGIONS:
+            regions[name] = REGIONS[name]
+        else:
+            raise ValueError(f"unknown region {name!r} (known: {', '.join(REGIONS)})")
+    if not regions:
+        raise ValueError("--regions must name at least one region")
+    return list(regions.values())
+
+
+def main(argv: list[str] | None = None) -> None:
+    p = argparse.ArgumentParser(description="Scrape WOKO listings & update CSV history")
+    p.add_argument("--bootstrap", action="store_true", help="Install dependencies from requirements.txt and exit")
+    p.add_argument("--csv", type=Path, default="data/woko_listings.csv", help="Output CSV path (default data/woko_listings.csv)")
+    p.add_argument("--store", choices=("csv", "sqlite", "journal"), default=os.getenv("WOKO_STORE", "csv"), help="History backend (default csv or WOKO_STORE env); sqlite applies only deltas, journal only appends them to --events")
+    p.add_argument("--db", type=Path, default="data/woko_listings.sqlite", help="SQLite history path for --store sqlite (default data/woko_listings.sqlite)")
+    p.add_argument("--export-csv", action="store_true", help="Write the stored history to --csv and exit")
+    p.add_argument("--export-parquet", type=Path, metavar="DIR", help="Write the stored history as Parquet partitioned by posting month to DIR and exit (needs pyarrow)")
+    p.add_argument("--compact", action="store_true", help="With --store journal: fold the journal into --csv, drop consumed events and exit")
+    p.add_argument("--compact-after", type=float, default=_env_float("COMPACT_AFTER_DAYS", 0.0), metavar="DAYS", help="With --store journal: fold after a poll once the oldest unfolded event is DAYS old (default 0 = only --compact, or COMPACT_AFTER_DAYS env)")
+    p.add_argument("--ledger", type=Path, default="data/woko_alerted.jsonl", help="Alert ledger path (default data/woko_alerted.jsonl)")
+    p.add_argument("--events", type=Path, default="data/woko_events.jsonl", help="Append-only change event log (default data/woko_events.jsonl)")
+    p.add_argument("--report-latency", action="store_true", help="Print p50/p95/p99 time from posting to alert, read from --ledger, and exit")
+    p.add_argument("--fresh-window", type=int, help=argparse.SUPPRESS)  # superseded by --ledger, accepted for old invocations
+    p.add_argument("--daemon", action="store_true", help="Stay resident and poll repeatedly instead of running once")
+    p.add_argument("--interval", type=float, default=_env_float("POLL_INTERVAL_SECONDS", 60.0), help="Daemon poll interval in seconds (default 60 or POLL_INTERVAL_SECONDS env)")
+    p.add_argument("--schedule", choices=("fixed", "adaptive"), default=os.getenv("POLL_SCHEDULE", "fixed"), help="Daemon cadence: fixed --interval, or adaptive – fast when WOKO usually posts, slow at night (default fixed or POLL_SCHEDULE env)")
+    p.add_argument("--poll-budget", type=float, default=_env_float("POLL_BUDGET", 0.0), help="Adaptive schedule: polls per day (default 0 = as many as --interval would make, or POLL_BUDGET env)")
+    p.add_argument("--min-interval", type=float, default=_env_float("POLL_MIN_INTERVAL", 15.0), help="Adaptive schedule: shortest interval in seconds (default 15)")
+    p.add_argument("--max-interval", type=float, default=_env_float("POLL_MAX_INTERVAL", 900.0), help="Adaptive schedule: longest interval in seconds (default 900)")
+    p.add_argument("--regions", default=os.getenv("WOKO_REGIONS", DEFAULT_REGION), help=f"Comma-separated regions to poll concurrently: {', '.join(REGIONS)} or name=URL (default {DEFAULT_REGION} or WOKO_REGIONS env)")
+    p.add_argument("--engine", help=argparse.SUPPRESS)  # one engine left, accepted for old invocations
+    p.add_argument("--async-concurrency", type=int, default=_env_int("ASYNC_CONCURRENCY", 100), help="Overview pages in flight at once (default 100 or ASYNC_CONCURRENCY env)")
+    p.add_argument("--parser", choices=sorted(PARSERS), default=os.getenv("WOKO_PARSER", "bs4"), help="HTML parser backend (default bs4 or WOKO_PARSER env); lxml / selectolax need their package installed")
+    p.add_argument("--enrich", action="store_true", default=bool(os.getenv("WOKO_ENRICH")), help="Fetch detail pages of new listings for rent, size, availability and address")
+    p.add_argument("--enrich-workers", type=int, default=_env_int("ENRICH_WORKERS", 4), help="Detail-page worker threads (default 4)")
+    p.add_argument("--enrich-per-host", type=int, default=_env_int("ENRICH_PER_HOST", 2), help="Concurrent detail requests per host (default 2)")
+    p.add_argument("--enrich-rate", type=float, default=_env_float("ENRICH_RATE", 2.0), help="Detail requests per second per host (default 2)")
+    p.add_argument("--detail-cache", type=Path, default="data/.cache/details", help="Detail-page cache directory (default data/.cache/details)")
+    p.add_argument("--detail-ttl", type=float, default=_env_float("DETAIL_TTL", 86400.0), help="Seconds before a cached detail page is revalidated (default 86400)")
+    p.add_argument("--detail-cache-mb", type=float, default=_env_float("DETAIL_CACHE_MB", 50.0), help="Detail cache size cap in MiB, LRU-evicted (default 50)")
+    p.add_argument("--profile", action="store_true", help="Log wall / CPU time per stage (import, fetch, parse, merge, save, alerts) as one PROFILE line per cycle")
+    p.add_argument("--profile-pstats", type=Path, metavar="PATH", help="With --profile: also write a cProfile dump (pstats format) to PATH")
+    p.add_argument("--profile-stacks", type=Path, metavar="PATH", help="With --profile: also sample all threads into a flamegraph-compatible collapsed-stack file")
+    p.add_argument("--metrics-port", type=int, default=_env_int("METRICS_PORT", 0), help="Serve Prometheus metrics on this port at /metrics (default off or METRICS_PORT env)")
+    p.add_argument("--metrics-host", default=os.getenv("METRICS_HOST", "127.0.0.1"), help="Address for --metrics-port (default 127.0.0.1)")
+    p.add_argument("--http-timeout", type=float, default=_env_float("HTTP_TIMEOUT", 30.0), help="Per-request timeout in seconds (default 30 or HTTP_TIMEOUT env)")
+    p.add_argument("--http-retries", type=int, default=_env_int("HTTP_RETRIES", 3), help="Retries on connection errors / timeouts / 429 / 5xx (default 3 or HTTP_RETRIES env)")
+    p.add_argument("--http-backoff", type=float, default=_env_float("HTTP_BACKOFF", 1.0), help="Base of the jittered exponential backoff between WOKO retries, seconds (default 1)")
+    p.add_argument("--http-backoff-cap", type=float, default=_env_float("HTTP_BACKOFF_CAP", 60.0), help="Longest wait before a retry, seconds; a longer Retry-After opens the circuit instead (default 60)")
+    p.add_argument("--breaker-failures", type=int, default=_env_int("BREAKER_FAILURES", 2), help="Failed WOKO fetches in a row that open the circuit breaker (default 2)")
+    p.add_argument("--breaker-cooldown", type=float, default=_env_float("BREAKER_COOLDOWN", 30.0), help="Seconds an open circuit waits before probing, doubled per failed probe up to four times this (default 30)")
+    p.add_argument("--http-pool-size", type=int, default=_env_int("HTTP_POOL_SIZE", 10), help="Keep-alive connections per host (default 10 or HTTP_POOL_SIZE env)")
+    p.add_argument("--alert-workers", type=int, default=_env_int("ALERT_WORKERS", 4), help="Concurrent Telegram sends (default 4 or ALERT_WORKERS env)")
+    p.add_argument("--alert-rate", type=float, default=_env_float("ALERT_RATE", 1.0), help="Sustained Telegram messages per second for the chat (default 1)")
+    p.add_argument("--alert-burst", type=int, default=_env_int("ALERT_BURST", 20), help="Messages that may be sent back-to-back before --alert-rate applies (default 20)")
+    p.add_argument("--alert-updates", action="store_true", default=bool(os.getenv("ALERT_UPDATES")), help="Also alert when a listing is edited in place (title, type, date or link)")
+    p.add_argument("--digest-threshold", type=int, default=_env_int("DIGEST_THRESHOLD", 10), help="Merge alerts into digests above this many listings; 0 disables (default 10)")
+    args = p.parse_args(argv)
+    if args.interval <= 0:
+        p.error("--interval must be positive")
+    if not 0 < args.min_interval <= args.max_interval or args.poll_budget < 0:
+        p.error("need 0 < --min-interval <= --max-interval and --poll-budget >= 0")
+    if args.alert_rate <= 0 or args.enrich_rate <= 0:
+        p.error("--alert-rate / --enrich-rate must be positive")
+    if args.http_pool_size < 1 or args.async_concurrency < 1:
+        p.error("--http-pool-size / --async-concurrency must be positive")
+    try:
+        args.regions = parse_regions(args.regions)
+    except ValueError as exc:
+        p.error(str(exc))
+    if args.compact and args.store != "journal":
+        p.error("--compact needs --store journal")
+    args.profile = args.profile or bool(args.profile_pstats or args.profile_stacks)
+    if args.bootstrap:
+        bootstrap()
+        return
+
+    profiler = sampler = None
+    if args.profile_pstats:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if args.profile_stacks:
+        sampler = StackSampler()
+        sampler.start()
+    try:
+        if args.profile:
+            warm_imports(args.parser)
+        _run(args)
+    except ImportError as exc:
+        logging.error(
+            "Missing dependency %r – run `%s --bootstrap` first (optional extras: `pip install %s`)",
+            exc.name, sys.argv[0], exc.name,
+        )
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            args.profile_pstats.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(args.profile_pstats)
+            logging.info("cProfile stats → %s", args.profile_pstats)
+        if sampler is not None:
+            sampler.dump(args.profile_stacks)
+
+
+def _run(args: argparse.Namespace) -> None:
+    if args.report_latency:
+        print_latency_report(args.ledger)
+        return
+    if args.compact:
+        compact(args)
+        return
+    if args.export_parquet:
+        export_parquet(open_store(args, EventLog(args.events)).listings(), args.export_parquet)
+        return
+    if args.export_csv:
+        store = open_store(args, EventLog(args.events))
+        if isinstance(store, JournalStore):
+            store.fold()
+        else:
+            save_if_changed(store.listings(), args.csv)
+        return
+
+    policy = RetryPolicy(args.http_retries, args.http_backoff, args.http_backoff_cap)
+    breakers = CircuitBreakers(args.breaker_failures, args.breaker_cooldown)
+    metrics = serve_metrics(args.metrics_host, args.metrics_port) if args.metrics_port else None
+    try:
+        import asyncio
+
+        asyncio.run(_poll(args, policy, breakers))
+    finally:
+        if metrics is not None:
+            metrics.shutdown()
+
+
+def _telegram_secrets() -> tuple[str, str] | None:
+    token, chat_id = os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
+    return (token, chat_id) if token and chat_id else None
+
+
+def _detail_cache(args: argparse.Namespace) -> DetailCache:
+    return DetailCache(args.detail_cache, ttl=args.detail_ttl, max_bytes=args.detail_cache_mb * 2**20)
+
+
+async def _poll(args: argparse.Namespace, policy: RetryPolicy, breakers: CircuitBreakers) -> None:
+    """One cycle or the daemon, with WOKO, Telegram and detail requests on one event loop.
+
+    Overview fetches use ``--async-concurrency`` / ``--http-pool-size``
+    clients of ``--http-pool-size`` connections each; the first one also
+    carries Telegram and detail requests.
+    """
+    from contextlib import AsyncExitStack
+
+    # one parse thread: keeps the loop responsive without threads competing for the GIL
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+    async with AsyncExitStack() as clients:
+        shards = [
+            await clients.enter_async_context(
+                make_client(args.http_timeout, args.http_retries, args.http_pool_size)
+            )
+            for _ in range(max(1, math.ceil(args.async_concurrency / args.http_pool_size)))
+        ]
+        client = shards[0]
+        secrets = _telegram_secrets()
+        dispatcher = None
+        if secrets:
+            dispatcher = AlertDispatcher(
+                client,
+                *secrets,
+                workers=args.alert_workers,
+                rate=args.alert_rate,
+                burst=args.alert_burst,
+                digest_threshold=args.digest_threshold,
+            )
+        enricher = None
+        if args.enrich:
+            enricher = DetailEnricher(
+                client,
+                _detail_cache(args),
+                executor,
+                workers=args.enrich_workers,
+                per_host=args.enrich_per_host,
+                host_rate=args.enrich_rate,
+                policy=policy,
+                breakers=breakers,
+            )
+        state = State(
+            client=client, shards=shards, executor=executor, dispatcher=dispatcher,
+            enricher=enricher, policy=policy, breakers=breakers,
+        )
+        try:
+            if args.daemon:
+                await run_daemon(args, state)
+                return
 
-    logging.info("Done – changed=%s", changed)
+            changed = await run_cycle(args, state)
+            if enricher is not None:
+                await enricher.drain()
+                apply_enrichment(state)
+            logging.info("Done – changed=%s", changed)
+        finally:
+            if enricher is not None:
+                enricher.close()
+            executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     main()